@@ -0,0 +1,30 @@
+"""Кэш изображений из папки data.
+
+Картинки загружаются при первом обращении и сразу переводятся в формат
+экрана (convert/convert_alpha), чтобы blit не конвертировал пиксели
+на каждом кадре.
+"""
+
+import os
+
+import pygame
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+_images = {}
+
+
+def load_image(name):
+    """Загружает картинку без конвертации (например, иконку до открытия окна)."""
+    return pygame.image.load(os.path.join(DATA_DIR, name))
+
+
+def image(name, alpha=True):
+    """Картинка в формате экрана; требует открытого окна."""
+    key = (name, alpha)
+    surface = _images.get(key)
+    if surface is None:
+        surface = load_image(name)
+        surface = surface.convert_alpha() if alpha else surface.convert()
+        _images[key] = surface
+    return surface
@@ -0,0 +1,138 @@
+"""Пакетная среда без окна для обучения и оценки агентов.
+
+N полей хранятся одним массивом NumPy: каждое поле — битовая маска в
+uint64, как в engine.Board. Установка фигур, очистка линий, подсчёт
+очков, выдача новых фигур и маски допустимых ходов считаются сразу для
+всех полей. Правила те же, что в game.Game: уровни сложности и таблицы
+псевдонимов из pieces.py, очки за клетки фигуры и engine.line_points.
+
+Ход задаётся номером действия ``slot * size * size + row * size + col``,
+где slot — номер блока в лотке (0..2).
+
+    env = BatchEnv(4096, seed=0)
+    legal = env.legal_moves()             # (N, 3 * 64)
+    rewards, done = env.step(actions)     # actions: (N,)
+"""
+
+import numpy as np
+
+from engine import PIECE_SIZES, get_masks, line_points
+from pieces import TIERS
+
+TRAY_SIZE = 3  # блоков в лотке
+
+
+class BatchEnv:
+    def __init__(self, n, size=8, seed=None):
+        if size * size > 64:
+            raise ValueError("BatchEnv хранит поле в uint64: размер не больше 8")
+        masks = get_masks(size)
+        self.n = n
+        self.size = size
+        self.cells = size * size
+        self.rng = np.random.default_rng(seed)
+
+        # Маски фигур во всех клетках; недопустимые позиции помечены в valid
+        pieces = len(masks.placements)
+        self.placement_masks = np.zeros((pieces + 1, self.cells), dtype=np.uint64)
+        self.placement_valid = np.zeros((pieces + 1, self.cells), dtype=bool)
+        for pid, positions in enumerate(masks.placements):
+            for (row, col), mask in positions.items():
+                self.placement_masks[pid, row * size + col] = mask
+                self.placement_valid[pid, row * size + col] = True
+        # Последняя строка — «пустой» слот лотка, в него ходить нельзя
+        self.empty_slot = pieces
+
+        self.line_masks = np.array(masks.rows + masks.cols, dtype=np.uint64)
+        self.piece_sizes = np.array(PIECE_SIZES + [0], dtype=np.int64)
+        self.no_lines_points = line_points(0, size)
+        self.line_points = size * 5 + 10  # за линию при комбо (см. line_points)
+
+        # Таблицы псевдонимов уровней сложности одним массивом: (уровни, фигуры)
+        self.tier_limits = np.array(
+            [tier.max_score for tier in TIERS if tier.max_score is not None]
+        )
+        self.tier_prob = np.array([tier.table.prob for tier in TIERS])
+        self.tier_alias = np.array([tier.table.alias for tier in TIERS])
+
+        self.boards = np.zeros(n, dtype=np.uint64)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.moves = np.zeros(n, dtype=np.int64)
+        self.tray = np.full((n, TRAY_SIZE), self.empty_slot, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def reset(self, where=None):
+        """Начинает новые партии на всех полях или на полях из маски where."""
+        if where is None:
+            where = np.ones(self.n, dtype=bool)
+        self.boards[where] = 0
+        self.scores[where] = 0
+        self.moves[where] = 0
+        self.tray[where] = self.empty_slot
+        self._refill(where)
+        self.done[where] = ~self.legal_moves()[where].any(axis=1)
+
+    def _refill(self, where):
+        """Выдаёт новые три фигуры на полях с пустым лотком (как generate_blocks)."""
+        index = np.flatnonzero(where & (self.tray == self.empty_slot).all(axis=1))
+        if not len(index):
+            return
+        count = len(index)
+        tiers = np.searchsorted(self.tier_limits, self.scores[index], side="right")
+        tiers = np.repeat(tiers[:, None], TRAY_SIZE, axis=1)
+        pieces = self.tier_prob.shape[1]
+        picks = (self.rng.random((count, TRAY_SIZE)) * pieces).astype(np.int64)
+        keep = self.rng.random((count, TRAY_SIZE)) < self.tier_prob[tiers, picks]
+        self.tray[index] = np.where(keep, picks, self.tier_alias[tiers, picks])
+
+    def legal_moves(self):
+        """Маска допустимых действий, форма (N, 3 * size * size)."""
+        masks = self.placement_masks[self.tray]  # (N, 3, cells)
+        free = (self.boards[:, None, None] & masks) == 0
+        legal = free & self.placement_valid[self.tray]
+        return legal.reshape(self.n, -1)
+
+    def step(self, actions):
+        """Делает ход на каждом поле; возвращает (награды, признаки конца партии).
+
+        Недопустимые ходы и ходы на законченных полях ничего не меняют и
+        дают нулевую награду.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        rows = np.arange(self.n)
+        slots, cells = np.divmod(actions, self.cells)
+        pids = self.tray[rows, slots]
+        masks = self.placement_masks[pids, cells]
+        ok = (
+            ~self.done
+            & self.placement_valid[pids, cells]
+            & ((self.boards & masks) == 0)
+        )
+
+        boards = np.where(ok, self.boards | masks, self.boards)
+        full = (boards[:, None] & self.line_masks) == self.line_masks
+        cleared = np.bitwise_or.reduce(
+            np.where(full, self.line_masks, np.uint64(0)), axis=1
+        )
+        lines = full.sum(axis=1)
+        self.boards = np.where(ok, boards & ~cleared, self.boards)
+
+        rewards = self.piece_sizes[pids] + np.where(
+            lines > 1, lines * self.line_points, self.no_lines_points
+        )
+        rewards = np.where(ok, rewards, 0)
+        self.scores += rewards
+        self.moves += ok
+        self.tray[rows[ok], slots[ok]] = self.empty_slot
+        self._refill(ok)
+
+        self.done |= ok & ~self.legal_moves().any(axis=1)
+        return rewards, self.done.copy()
+
+    def random_actions(self, legal=None):
+        """Случайный допустимый ход для каждого поля (для законченных — 0)."""
+        if legal is None:
+            legal = self.legal_moves()
+        weights = self.rng.random(legal.shape) * legal
+        return weights.argmax(axis=1)
@@ -0,0 +1,373 @@
+"""Битбордовое ядро игрового поля.
+
+Занятость поля хранится одним целым числом: бит ``row * size + col``
+равен 1, если клетка занята. Маски всех шаблонов во всех допустимых
+позициях, а также маски строк и столбцов считаются один раз на размер
+поля, поэтому проверка, установка блока и поиск заполненных линий
+сводятся к нескольким операциям AND/OR. Цвета клеток хранятся отдельным
+слоем (по байту на клетку) и нужны только для отрисовки.
+
+Для больших полей (до 32x32) проверки не перебирают позиции и линии:
+все допустимые позиции фигуры находятся сразу сдвигами маски свободных
+клеток (Board.anchors), а заполненные линии — по счётчикам занятых
+клеток в каждой строке и столбце.
+"""
+
+from functools import lru_cache
+
+# Шаблоны блоков (матрицы)
+TEMPLATES = [
+    # Квадраты
+    [[[1]], [[1, 1], [1, 1]]],  # Одинарный блок  # Квадрат 2х2
+    # Линии
+    [
+        [[1, 1]],  # Горизонтальная линия
+        [[1], [1]],  # Вертикальная линия
+        [[1, 1, 1]],  # Длинная горизонтальная линия
+        [[1], [1], [1]],  # Длинная вертикальная линия
+    ],
+    # Маленькие уголки
+    [
+        [[1, 0], [1, 1]],  # Левый нижний уголок
+        [[0, 1], [1, 1]],  # Правый нижний уголок
+        [[1, 1], [1, 0]],  # Левый верхний уголок
+        [[1, 1], [0, 1]],  # Правый верхний уголок
+    ],
+    # Г-образные блоки
+    [
+        [[1, 1], [0, 1], [0, 1]],  # Правый верхний уголок
+        [[1, 1], [1, 0], [1, 0]],  # Левый верхний уголок
+        [[0, 1], [0, 1], [1, 1]],  # Правый нижний уголок
+        [[1, 0], [1, 0], [1, 1]],  # Левый нижний уголок
+    ],
+    # Большие уголки
+    [
+        [[1, 1, 1], [0, 0, 1], [0, 0, 1]],  # Правый верхний уголок
+        [[1, 1, 1], [1, 0, 0], [1, 0, 0]],  # Левый верхний уголок
+        [[0, 0, 1], [0, 0, 1], [1, 1, 1]],  # Правый нижний уголок
+        [[1, 0, 0], [1, 0, 0], [1, 1, 1]],  # Левый нижний уголок
+    ],
+]
+
+# Плоский список шаблонов: индекс в нём — идентификатор фигуры
+PIECES = [template for group in TEMPLATES for template in group]
+# Количество клеток в каждой фигуре
+PIECE_SIZES = [sum(sum(row) for row in template) for template in PIECES]
+
+
+def _shape_key(template):
+    return tuple(tuple(row) for row in template)
+
+
+_PIECE_IDS = {_shape_key(template): pid for pid, template in enumerate(PIECES)}
+
+
+def piece_id(template):
+    """Возвращает идентификатор фигуры по её матрице."""
+    return _PIECE_IDS[_shape_key(template)]
+
+
+def iter_bits(mask):
+    """Перебирает номера установленных битов маски."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def line_points(lines_cleared, size):
+    """Очки за очистку линий с увеличением за комбо."""
+    if lines_cleared > 1:
+        return lines_cleared * (size * 5 + 10)
+    return size * 3 + 5
+
+
+class Masks:
+    """Предвычисленные маски для поля заданного размера."""
+
+    def __init__(self, size):
+        self.size = size
+        self.full = (1 << size * size) - 1
+        row_mask = (1 << size) - 1
+        self.rows = [row_mask << (row * size) for row in range(size)]
+        col_mask = sum(1 << (row * size) for row in range(size))
+        self.cols = [col_mask << col for col in range(size)]
+
+        # placements[pid][(row, col)] — маска фигуры с левым верхним углом в клетке
+        self.placements = []
+        # offsets[pid] — сдвиги клеток фигуры от левого верхнего угла
+        self.offsets = []
+        # shapes[pid] — маска фигуры с левым верхним углом в клетке 0
+        self.shapes = []
+        # anchors[pid] — биты клеток, в которые фигура помещается углом
+        self.anchors = []
+        for template in PIECES:
+            offsets = [
+                row_idx * size + col_idx
+                for row_idx, row in enumerate(template)
+                for col_idx, cell in enumerate(row)
+                if cell
+            ]
+            shape = sum(1 << offset for offset in offsets)
+            positions = {}
+            anchors = 0
+            for row in range(size - len(template) + 1):
+                for col in range(size - len(template[0]) + 1):
+                    positions[(row, col)] = shape << (row * size + col)
+                    anchors |= 1 << (row * size + col)
+            self.placements.append(positions)
+            self.offsets.append(offsets)
+            self.shapes.append(shape)
+            self.anchors.append(anchors)
+        # Те же маски одним кортежем — для быстрого поиска хотя бы одного хода
+        self.placement_lists = [tuple(p.values()) for p in self.placements]
+
+    def free_anchors(self, occupied, pid):
+        """Маска клеток, куда фигуру можно поставить углом на поле occupied."""
+        free = ~occupied & self.full
+        result = self.anchors[pid]
+        for offset in self.offsets[pid]:
+            result &= free >> offset
+        return result
+
+    def settle(self, occupied):
+        """Убирает заполненные линии из маски занятости.
+
+        Возвращает (новая маска, число очищенных линий); используется
+        там, где нужен расчёт без изменения Board (поиск подсказки и т.п.).
+        """
+        cleared = 0
+        lines = 0
+        for mask in self.rows:
+            if occupied & mask == mask:
+                cleared |= mask
+                lines += 1
+        for mask in self.cols:
+            if occupied & mask == mask:
+                cleared |= mask
+                lines += 1
+        return occupied & ~cleared, lines
+
+
+# Байт цвета -> символ двоичной записи: 0 — свободно, иначе занято
+_OCCUPIED_DIGITS = bytes([ord("0")] + [ord("1")] * 255)
+
+
+@lru_cache(maxsize=None)
+def get_masks(size):
+    """Маски строятся один раз на каждый размер поля."""
+    return Masks(size)
+
+
+class Board:
+    """Игровое поле: битовая маска занятости плюс слой цветов."""
+
+    def __init__(self, size=8):
+        self.size = size
+        self.masks = get_masks(size)
+        self.occupied = 0
+        # Номер цвета каждой клетки: 0 — пусто, n — settings.block_colors[n - 1]
+        self.colors = bytearray(size * size)
+        # Кэш «есть ли у фигуры ход»; сбрасывается только при изменении поля
+        self._has_move = {}
+        # Кэш предпросмотра по (фигура, строка, столбец); сбрасывается так же
+        self._previews = {}
+        # Сколько клеток занято в каждой строке и каждом столбце
+        self.row_fill = [0] * size
+        self.col_fill = [0] * size
+        # Сколько раз реально выполнялся поиск хода (кэш-промахи)
+        self.move_checks = 0
+
+    def reset(self):
+        """Очищает поле, не создавая новых объектов."""
+        self.occupied = 0
+        self.colors[:] = bytes(len(self.colors))
+        self.recount()
+
+    def restore(self, colors):
+        """Восстанавливает поле по номерам цветов клеток."""
+        self.colors[:] = colors
+        # Старший бит маски — последняя клетка, поэтому строка разворачивается
+        self.occupied = int(bytes(self.colors).translate(_OCCUPIED_DIGITS)[::-1], 2)
+        self.recount()
+
+    def recount(self):
+        """Пересчитывает счётчики строк и столбцов по occupied и сбрасывает кэши.
+
+        Нужен после того, как маска occupied записана напрямую.
+        """
+        occupied = self.occupied
+        masks = self.masks
+        self.row_fill[:] = [bin(occupied & mask).count("1") for mask in masks.rows]
+        self.col_fill[:] = [bin(occupied & mask).count("1") for mask in masks.cols]
+        self._has_move.clear()
+        self._previews.clear()
+
+    def color_at(self, row, col):
+        return self.colors[row * self.size + col]
+
+    def placement(self, pid, row, col):
+        """Маска фигуры в позиции или None, если фигура выходит за поле."""
+        return self.masks.placements[pid].get((row, col))
+
+    def can_place(self, pid, row, col):
+        """Проверка возможности размещения фигуры."""
+        mask = self.masks.placements[pid].get((row, col))
+        return mask is not None and not self.occupied & mask
+
+    def anchors(self, pid):
+        """Маска всех клеток, куда фигуру можно поставить левым верхним углом.
+
+        Считается за число клеток фигуры операций над маской, независимо
+        от размера поля.
+        """
+        return self.masks.free_anchors(self.occupied, pid)
+
+    def has_move(self, pid):
+        """Есть ли для фигуры хотя бы одна свободная позиция."""
+        result = self._has_move.get(pid)
+        if result is None:
+            self.move_checks += 1
+            result = self._has_move[pid] = bool(self.anchors(pid))
+        return result
+
+    def preview(self, pid, row, col):
+        """Что будет, если поставить фигуру в (row, col).
+
+        Возвращает (можно ли поставить, маска клеток очищаемых линий) или
+        None, если фигура выходит за поле. Для каждой позиции считается
+        один раз, пока поле не изменится.
+        """
+        key = (pid, row, col)
+        if key in self._previews:
+            return self._previews[key]
+        mask = self.masks.placements[pid].get((row, col))
+        if mask is None:
+            result = None
+        elif self.occupied & mask:
+            result = (False, 0)
+        else:
+            # Линия заполнится, если фигура займёт все оставшиеся в ней клетки
+            size = self.size
+            rows, cols = {}, {}
+            for offset in self.masks.offsets[pid]:
+                index = offset + row * size + col
+                rows[index // size] = rows.get(index // size, 0) + 1
+                cols[index % size] = cols.get(index % size, 0) + 1
+            cleared = 0
+            for line, added in rows.items():
+                if self.row_fill[line] + added == size:
+                    cleared |= self.masks.rows[line]
+            for line, added in cols.items():
+                if self.col_fill[line] + added == size:
+                    cleared |= self.masks.cols[line]
+            result = (True, cleared)
+        self._previews[key] = result
+        return result
+
+    def place(self, pid, row, col, color):
+        """Размещение фигуры цвета color (номер, 1..255); возвращает число клеток."""
+        mask = self.masks.placements[pid][(row, col)]
+        self.occupied |= mask
+        self._has_move.clear()
+        self._previews.clear()
+        colors = self.colors
+        size = self.size
+        for index in iter_bits(mask):
+            colors[index] = color
+            self.row_fill[index // size] += 1
+            self.col_fill[index % size] += 1
+        return PIECE_SIZES[pid]
+
+    def can_place_all(self, pids, budget=20000):
+        """Можно ли поставить все фигуры в каком-нибудь порядке (с очисткой линий).
+
+        Перебор в глубину с запоминанием пройденных состояний; ходы,
+        очищающие линии, пробуются первыми. Ветка отсекается, как только
+        одной из оставшихся фигур некуда встать даже после очистки всех
+        линий, которые фигуры набора вообще могут заполнить. Если перебор
+        превышает budget состояний, возвращается None: ответ неизвестен, и
+        набор не считается играбельным.
+        """
+        masks = self.masks
+        size = self.size
+        # Очистить можно только линии, где пустых клеток не больше, чем
+        # клеток во всём наборе; остальные клетки поля останутся занятыми
+        cells = sum(PIECE_SIZES[pid] for pid in pids)
+        clearable = 0
+        for line, count in enumerate(self.row_fill):
+            if size - count <= cells:
+                clearable |= masks.rows[line]
+        for line, count in enumerate(self.col_fill):
+            if size - count <= cells:
+                clearable |= masks.cols[line]
+        seen = set()
+
+        def search(occupied, remaining):
+            if not remaining:
+                return True
+            key = (occupied, remaining)
+            if key in seen:
+                return False
+            if len(seen) >= budget:
+                return None
+            seen.add(key)
+            anchors = {pid: masks.free_anchors(occupied, pid) for pid in remaining}
+            if not all(anchors.values()):
+                hopeful = occupied & ~clearable
+                for pid, found in anchors.items():
+                    if not found and not masks.free_anchors(hopeful, pid):
+                        return False
+            for i, pid in enumerate(remaining):
+                if i and pid == remaining[i - 1]:
+                    continue
+                rest = remaining[:i] + remaining[i + 1 :]
+                shape = masks.shapes[pid]
+                later = []
+                for index in iter_bits(anchors[pid]):
+                    mask = shape << index
+                    if mask & clearable:
+                        settled, lines = masks.settle(occupied | mask)
+                    else:
+                        # Фигура не задевает линий, которые можно заполнить
+                        settled, lines = occupied | mask, 0
+                    if not lines:
+                        later.append(settled)
+                        continue
+                    result = search(settled, rest)
+                    if result is not False:
+                        return result
+                for settled in later:
+                    result = search(settled, rest)
+                    if result is not False:
+                        return result
+            return False
+
+        return search(self.occupied, tuple(sorted(pids)))
+
+    def full_lines(self):
+        """Номера заполненных строк и столбцов."""
+        size = self.size
+        rows = [i for i, count in enumerate(self.row_fill) if count == size]
+        cols = [i for i, count in enumerate(self.col_fill) if count == size]
+        return rows, cols
+
+    def clear_lines(self):
+        """Очищает заполненные строки и столбцы и возвращает их номера."""
+        rows, cols = self.full_lines()
+        if rows or cols:
+            cleared = 0
+            for row in rows:
+                cleared |= self.masks.rows[row]
+            for col in cols:
+                cleared |= self.masks.cols[col]
+            self.occupied &= ~cleared
+            self._has_move.clear()
+            self._previews.clear()
+            colors = self.colors
+            size = self.size
+            for index in iter_bits(cleared):
+                colors[index] = 0
+                self.row_fill[index // size] -= 1
+                self.col_fill[index % size] -= 1
+        return rows, cols
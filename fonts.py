@@ -0,0 +1,34 @@
+"""Общий реестр шрифтов и LRU-кэш отрисованных надписей."""
+
+from collections import OrderedDict
+
+import pygame
+
+# Сколько отрисованных надписей держать в кэше
+TEXT_CACHE_SIZE = 256
+
+_fonts = {}
+_texts = OrderedDict()
+
+
+def get_font(size, face=None):
+    """Возвращает шрифт, создавая его только при первом обращении."""
+    key = (face, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(face, size)
+    return font
+
+
+def render_text(text, size, color, antialias=True, face=None):
+    """Отрисованная надпись из кэша; повторные вызовы не растеризуют текст."""
+    key = (text, face, size, tuple(color), antialias)
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+    surface = get_font(size, face).render(text, antialias, color)
+    _texts[key] = surface
+    if len(_texts) > TEXT_CACHE_SIZE:
+        _texts.popitem(last=False)
+    return surface
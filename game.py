@@ -0,0 +1,254 @@
+"""Состояние партии без привязки к окну: поле, блоки в лотке и счёт."""
+
+import random
+
+import pygame
+
+from engine import PIECES, Board, line_points, piece_id
+from pieces import difficulty_tier
+from settings import (
+    GUARANTEED_PLAYABLE,
+    SHADOW_OFFSET,
+    block_colors,
+    block_size,
+    field_top,
+    grid_size,
+    height,
+    width,
+)
+
+TRAY_SIZE = 3  # блоков в наборе
+MAX_REROLLS = 20  # сколько раз можно перевыбрать неиграбельный набор
+# Шаг между блоками в лотке: ширина самой широкой фигуры и зазор
+TRAY_STEP = max(len(template[0]) for template in PIECES) * block_size + 20
+
+
+# Класс блока
+class Block:
+    __slots__ = (
+        "template",
+        "template_id",
+        "color_id",
+        "color",
+        "slot",
+        "position",
+        "dragging",
+        "field_x",
+        "field_y",
+        "initial_position",
+    )
+
+    # Общий для всех блоков кэш спрайтов (render.PieceSprites, см. main.init_display)
+    sprites = {}
+
+    def __init__(
+        self, template, x, y, field_x, field_y, rng=random, slot=0, color_id=None
+    ):
+        self.template = template
+        self.template_id = piece_id(template)
+        if color_id is None:
+            # Столько же случайных чисел, сколько у rng.choice(block_colors)
+            color_id = rng.choice(range(1, len(block_colors) + 1))
+        self.color_id = color_id  # номер цвета, как в Board.colors
+        self.color = block_colors[color_id - 1]
+        self.slot = slot  # место в лотке (0..2), нужно для записи ходов
+        self.position = (x, y)
+        self.dragging = False
+        self.field_x = field_x
+        self.field_y = field_y
+        self.initial_position = (x, y)
+
+    def draw(self, surface):
+        surface.blit(self.sprites[(self.template_id, self.color)], self.position)
+
+    def rect(self):
+        """Область экрана, занимаемая блоком вместе с тенью."""
+        return pygame.Rect(
+            self.position[0],
+            self.position[1],
+            len(self.template[0]) * block_size + SHADOW_OFFSET,
+            len(self.template) * block_size + SHADOW_OFFSET,
+        )
+
+    def move(self, pos_x, pos_y):
+        self.position = pos_x, pos_y
+
+    def reset_position(self):
+        """Возвращает блок в начальную позицию."""
+        self.position = self.initial_position
+
+    def snap_cell(self):
+        """Клетка (строка, столбец), к которой блок привяжется при отпускании."""
+        return (
+            round((self.position[1] - self.field_y) / block_size),
+            round((self.position[0] - self.field_x) / block_size),
+        )
+
+    def snap_to_grid(self):
+        """Привязка блока к сетке."""
+        self.move_to_cell(*self.snap_cell())
+
+    def grid_cell(self):
+        """Возвращает (строка, столбец) левого верхнего угла блока на сетке."""
+        return (
+            (self.position[1] - self.field_y) // block_size,
+            (self.position[0] - self.field_x) // block_size,
+        )
+
+    def move_to_cell(self, row, col):
+        """Ставит блок левым верхним углом в клетку (row, col)."""
+        self.position = (
+            self.field_x + col * block_size,
+            self.field_y + row * block_size,
+        )
+
+
+class Game:
+    """Одна партия. reset() начинает новую, не создавая объект заново.
+
+    Все случайные решения партии выводятся из seed: каждый набор блоков
+    берётся из своего генератора random.Random(f"{seed}:{номер набора}"),
+    поэтому партию можно воспроизвести по seed и списку ходов (см. replay.py).
+    """
+
+    def __init__(
+        self,
+        field_x=None,
+        field_y=field_top,
+        seed=None,
+        guaranteed_playable=None,
+        size=grid_size,
+    ):
+        if field_x is None:
+            field_x = (width - (size * block_size)) // 2
+        if guaranteed_playable is None:
+            guaranteed_playable = GUARANTEED_PLAYABLE
+        self.field_x = field_x
+        self.field_y = field_y
+        self.guaranteed_playable = guaranteed_playable
+        self.board = Board(size)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Начинает новую партию на том же поле; без seed он выбирается случайно."""
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.refills = 0  # сколько наборов блоков уже выдано
+        self.moves = []  # ходы партии: (место в лотке, строка, столбец)
+        self.board.reset()
+        self.score = 0
+        self.lines = 0  # сколько линий очищено за партию
+        self.play_time = 0.0  # секунд в игре без пауз (считает main.play)
+        # Результат проверки на проигрыш; None — нужно пересчитать
+        self._game_over = None
+        self.blocks = self.generate_blocks()
+
+    def generate_blocks(self):
+        """Новый набор из трёх блоков; вероятности фигур зависят от счёта.
+
+        В режиме guaranteed_playable наборы, которые нельзя целиком
+        поставить на текущее поле или для которых перебор не уложился в
+        бюджет, отбрасываются (не больше MAX_REROLLS раз).
+        """
+        self._game_over = None
+        rng = random.Random(f"{self.seed}:{self.refills}")
+        self.refills += 1
+
+        tier = difficulty_tier(self.score)
+        for _ in range(MAX_REROLLS + 1):
+            pids = [tier.sample(rng) for _ in range(TRAY_SIZE)]
+            if not self.guaranteed_playable or self.board.can_place_all(pids):
+                break
+
+        return [self.tray_block(pid, slot, rng) for slot, pid in enumerate(pids)]
+
+    def tray_block(self, pid, slot, rng=random, color_id=None):
+        """Блок фигуры pid на месте slot в лотке."""
+        return Block(
+            PIECES[pid],
+            35 + slot * TRAY_STEP,
+            height - 150,
+            self.field_x,
+            self.field_y,
+            rng,
+            slot,
+            color_id,
+        )
+
+    def load_state(
+        self, seed, score, refills, moves, colors, tray, lines=0, play_time=0.0
+    ):
+        """Восстанавливает партию (см. snapshot.py).
+
+        tray — блоки лотка как (фигура, номер цвета, место в лотке).
+        """
+        self.seed = seed
+        self.score = score
+        self.lines = lines
+        self.play_time = play_time
+        self.refills = refills
+        self.moves = moves
+        self.board.restore(colors)
+        self.blocks = [
+            self.tray_block(pid, slot, color_id=color_id)
+            for pid, color_id, slot in tray
+        ]
+        self._game_over = None
+
+    def can_place_block(self, block):
+        """Проверка возможности размещения блока."""
+        row, col = block.grid_cell()
+        return self.board.can_place(block.template_id, row, col)
+
+    def preview(self, block):
+        """Предпросмотр броска блока в текущей позиции (см. Board.preview)."""
+        row, col = block.snap_cell()
+        return self.board.preview(block.template_id, row, col)
+
+    def is_game_over(self):
+        """Проверяет, возможен ли ход.
+
+        Результат кэшируется и пересчитывается только после place_block,
+        clear_lines или generate_blocks, поэтому во время перетаскивания
+        проверок нет (см. board.move_checks).
+        """
+        if self._game_over is None:
+            self._game_over = not any(
+                self.board.has_move(block.template_id) for block in self.blocks
+            )
+        return self._game_over
+
+    def place_block(self, block):
+        """Размещение блока на поле."""
+        self._game_over = None
+        row, col = block.grid_cell()
+        self.score += self.board.place(block.template_id, row, col, block.color_id)
+
+    def clear_lines(self):
+        """Очистка заполненных строк и столбцов с увеличением очков за несколько линий."""
+        self._game_over = None
+        rows_cleared, cols_cleared = self.board.clear_lines()
+
+        # Подсчет очков с увеличением за комбо
+        lines_cleared = len(rows_cleared) + len(cols_cleared)
+        self.lines += lines_cleared
+        self.score += line_points(lines_cleared, self.board.size)
+
+    def drop_block(self, block):
+        """Бросок блока на поле: привязка к сетке, установка и очистка линий.
+
+        Возвращает True, если блок установлен; иначе блок возвращается в лоток.
+        """
+        block.snap_to_grid()
+        if not self.can_place_block(block):
+            block.reset_position()
+            return False
+        self.place_block(block)
+        self.moves.append((block.slot,) + block.grid_cell())
+        self.clear_lines()
+        self.blocks.remove(block)
+        self._game_over = None
+        if not self.blocks:
+            self.blocks = self.generate_blocks()
+        return True
@@ -1,157 +1,146 @@
+import time
+
+# Отсчёт времени до первого кадра начинается до импорта pygame
+START_TIME = time.perf_counter()
+
 import pygame
-import random
 import sys
 import os
+import atexit
+
+import assets
+from fonts import render_text
+from game import Block, Game
+from overlay import Overlay
+from profiler import EVENTS, GAME_OVER, FrameProfiler
+from render import BoardRenderer, PieceSprites
+import replay
+from scores import ScoreStore
+import snapshot
+from settings import (
+    BG_COLOR,
+    BLACK,
+    FADE_TIME,
+    GRAY,
+    PAUSE_FADE_TIME,
+    WHITE,
+    block_size,
+    height,
+    width,
+)
+from solver import HintWorker
+from timing import FrameScheduler
 
-pygame.init()
-
-# Размеры экрана
-width, height = 450, 600
-block_size = 40
-grid_size = 8
-
-# Цвета
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-GRAY = (200, 200, 200)
-BG_COLOR = (135, 206, 250)  # Фон
-SHADOW_COLOR = (100, 100, 100, 50)  # Тень блока
-block_colors = [
-    (239, 83, 80),  # Красный
-    (102, 187, 106),  # Зеленый
-    (66, 165, 245),  # Синий
-    (255, 238, 88),  # Желтый
-    (171, 71, 188),  # Фиолетовый
-]
-
-# Настройка окна
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption("Block Blast")
 script_path = os.path.dirname(os.path.abspath(__file__))
-icon = pygame.image.load(os.path.join(script_path, "data", "icon.png"))
-records_path = os.path.join(script_path, "data", "records.txt")
-pygame.display.set_icon(icon)
-
-# Загрузка логотипа игры
-logo = pygame.image.load(os.path.join(script_path, "data", "block-blast-logo.png"))
-logo_rect = logo.get_rect(center=(width // 2, height // 2 - 45))
-
-# Шаблоны блоков (матрицы)
-TEMPLATES = [
-    # Квадраты
-    [[[1]], [[1, 1], [1, 1]]],  # Одинарный блок  # Квадрат 2х2
-    # Линии
-    [
-        [[1, 1]],  # Горизонтальная линия
-        [[1], [1]],  # Вертикальная линия
-        [[1, 1, 1]],  # Длинная горизонтальная линия
-        [[1], [1], [1]],  # Длинная вертикальная линия
-    ],
-    # Маленькие уголки
-    [
-        [[1, 0], [1, 1]],  # Левый нижний уголок
-        [[0, 1], [1, 1]],  # Правый нижний уголок
-        [[1, 1], [1, 0]],  # Левый верхний уголок
-        [[1, 1], [0, 1]],  # Правый верхний уголок
-    ],
-    # Г-образные блоки
-    [
-        [[1, 1], [0, 1], [0, 1]],  # Правый верхний уголок
-        [[1, 1], [1, 0], [1, 0]],  # Левый верхний уголок
-        [[0, 1], [0, 1], [1, 1]],  # Правый нижний уголок
-        [[1, 0], [1, 0], [1, 1]],  # Левый нижний уголок
-    ],
-    # Большие уголки
-    [
-        [[1, 1, 1], [0, 0, 1], [0, 0, 1]],  # Правый верхний уголок
-        [[1, 1, 1], [1, 0, 0], [1, 0, 0]],  # Левый верхний уголок
-        [[0, 0, 1], [0, 0, 1], [1, 1, 1]],  # Правый нижний уголок
-        [[1, 0, 0], [1, 0, 0], [1, 1, 1]],  # Левый нижний уголок
-    ],
-]
-
-
-# Класс блока
-class Block:
-    def __init__(self, template, x, y, field_x, field_y):
-        self.template = template
-        self.color = random.choice(block_colors)
-        self.position = (x, y)
-        self.dragging = False
-        self.field_x = field_x
-        self.field_y = field_y
-        self.initial_position = (x, y)
-
-    def draw(self):
-        for row_idx, row in enumerate(self.template):
-            for col_idx, cell in enumerate(row):
-                if cell:
-                    rect = pygame.Rect(
-                        self.position[0] + col_idx * block_size,
-                        self.position[1] + row_idx * block_size,
-                        block_size,
-                        block_size,
-                    )
-                    shadow_rect = rect.move(5, 5)  # Тень
-                    pygame.draw.rect(screen, SHADOW_COLOR, shadow_rect)
-                    pygame.draw.rect(screen, self.color, rect)
-                    pygame.draw.rect(screen, BLACK, rect, 2)  # Контур блока
-
-    def move(self, pos_x, pos_y):
-        self.position = pos_x, pos_y
-
-    def reset_position(self):
-        """Возвращает блок в начальную позицию."""
-        self.position = self.initial_position
-
-    def snap_to_grid(self):
-        """Привязка блока к сетке."""
-        grid_x = (
-            round((self.position[0] - self.field_x) / block_size) * block_size
-            + self.field_x
-        )
-        grid_y = (
-            round((self.position[1] - self.field_y) / block_size) * block_size
-            + self.field_y
-        )
-        self.position = grid_x, grid_y
-
-    def get_cells(self):
-        """Возвращает координаты клеток, занимаемых блоком."""
-        cells = []
-        for row_idx, row in enumerate(self.template):
-            for col_idx, cell in enumerate(row):
-                if cell:
-                    x = (self.position[0] - self.field_x) // block_size + col_idx
-                    y = (self.position[1] - self.field_y) // block_size + row_idx
-                    cells.append((y, x))
-        return cells
-
-
-# Функция перезапуска игры
-def restart_game():
-    main()
+# Каталог рекордов, автосохранения и записей партий; другой каталог
+# задаётся переменной окружения: BLOCK_BLAST_DATA=/tmp/bb python main.py
+data_path = os.environ.get("BLOCK_BLAST_DATA", os.path.join(script_path, "data"))
+records_path = os.path.join(data_path, "records.txt")
+scores_path = os.path.join(data_path, "scores.db")
+replay_path = os.path.join(data_path, "last_game.bbr")
+trace_path = os.path.join(data_path, "frame_trace.json")
+autosave_path = os.path.join(data_path, "autosave.bbs")
+
+# Окно создаётся в init_display(), импорт модуля ничего не открывает
+screen = None
+
+# Время от запуска до первого кадра, с (см. first_frame_shown)
+first_frame_time = None
+# Вывести время до первого кадра и выйти (python main.py --startup-time)
+report_startup = False
+
+# Общий планировщик кадров для меню и игры
+scheduler = FrameScheduler()
+# Замер фаз кадра (F3 — оверлей, F4 — выгрузка трассы)
+profiler = FrameProfiler(scheduler=scheduler)
+
+
+def init_display():
+    """Открывает окно. Запускаются только видео и шрифты, без звука и джойстиков."""
+    global screen
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_icon(assets.load_image("icon.png"))
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption("Block Blast")
+    # Спрайты фигур рисуются при первом обращении
+    Block.sprites = PieceSprites()
+    return screen
+
+
+def first_frame_shown():
+    """Запоминает время до первого кадра (один раз за запуск)."""
+    global first_frame_time
+    if first_frame_time is not None:
+        return
+    first_frame_time = time.perf_counter() - START_TIME
+    if report_startup:
+        print(f"Первый кадр через {first_frame_time * 1000:.1f} мс")
+        pygame.quit()
+        sys.exit()
+
+
+# Сцены игры
+SCENE_START_MENU = "start_menu"
+SCENE_PLAYING = "playing"
+SCENE_PAUSED = "paused"
+SCENE_GAME_OVER = "game_over"
+
+# Событие готовности подсказки из фонового потока
+HINT_READY = pygame.USEREVENT + 1
+# Фоновый поток обновил таблицу рекордов
+SCORES_READY = pygame.USEREVENT + 2
+
+
+class SceneView:
+    """Текущая сцена: её имя, кнопки (прямоугольники нажатия) и партия.
+
+    Обновляется при входе в сцену; по ней автоматические прогоны
+    (tools/soak.py) находят, куда нажимать.
+    """
+
+    def __init__(self):
+        self.name = None
+        self.buttons = {}
+        self.game = None
+
+    def show(self, name, game=None, **buttons):
+        self.name = name
+        self.game = game
+        self.buttons = buttons
+
+
+view = SceneView()
+
+
+def post_event(event_type):
+    """Будит главный цикл из фонового потока, если окно ещё открыто."""
+    if pygame.display.get_init():
+        pygame.event.post(pygame.event.Event(event_type))
 
 
 # Меню старта игры
-def show_start_menu():
-    """Отображает стартовое меню с кнопкой начала игры и рекордами."""
-    title_font = pygame.font.Font(None, 36)
-    text = title_font.render("Block Blast", True, WHITE)
+def show_start_menu(scores, resume=False):
+    """Отображает стартовое меню с кнопкой начала (или продолжения) игры и рекордами."""
+    # Логотип игры
+    logo = assets.image("block-blast-logo.png")
+    logo_rect = logo.get_rect(center=(width // 2, height // 2 - 45))
+
+    text = render_text("Block Blast", 36, WHITE)
     text_rect = text.get_rect(center=(width // 2, height // 2 - 50))
 
-    button_font = pygame.font.Font(None, 28)
-    button_text = button_font.render("СТАРТ", True, WHITE)
+    button_text = render_text("ПРОДОЛЖИТЬ" if resume else "СТАРТ", 28, WHITE)
     button_rect = button_text.get_rect(center=(width // 2, height // 2 + 30))
     button_box = button_rect.inflate(20, 10)
 
-    records_font = pygame.font.Font(None, 24)
-    records_title = records_font.render("Рекорды:", True, WHITE)
+    records_title = render_text("Рекорды:", 24, WHITE)
     records_title_rect = records_title.get_rect(topright=(100, 20))
-
-    records = load_records()  # Загружаем рекорды
+    view.show(SCENE_START_MENU, start=button_box)
 
     while True:
+        # Рекорды из кэша; база читается и обновляется в фоне
+        records = scores.top()
+
         screen.fill(BG_COLOR)
         screen.blit(logo, logo_rect)
         pygame.draw.rect(screen, GRAY, button_box)  # Кнопка
@@ -163,19 +152,22 @@ def show_start_menu():
 
         if records:
             for i, record in enumerate(records):
-                record_text = records_font.render(f"{i + 1}. {record}", True, WHITE)
+                record_text = render_text(f"{i + 1}. {record}", 24, WHITE)
                 record_rect = record_text.get_rect(
                     topright=(70, records_title_rect.bottom + 5 + i * 20)
                 )
                 screen.blit(record_text, record_rect)
         else:
-            no_records_text = records_font.render("Нет рекордов", True, WHITE)
+            no_records_text = render_text("Нет рекордов", 24, WHITE)
             no_records_rect = no_records_text.get_rect(
                 center=(80, records_title_rect.bottom + 15)
             )
             screen.blit(no_records_text, no_records_rect)
 
-        for event in pygame.event.get():
+        pygame.display.flip()
+        first_frame_shown()
+
+        for event in scheduler.events(active=False):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -184,250 +176,133 @@ def show_start_menu():
             ):
                 return
 
-        pygame.display.flip()
-
-
-def load_records():
-    """Загружает три рекорда из файла records.txt."""
-    records = []
-    try:
-        with open(records_path, "r") as file:
-            records = [
-                int(record)
-                for record in file.readline().strip().split()
-                if int(record) > 0
-            ]
 
-    except FileNotFoundError:
-        return []
-    except Exception as e:
-        return [f"Ошибка: {str(e)}"]
-
-    return records if records else []
-
-
-def show_game_over_menu(score):
+def show_game_over_menu(overlay, score):
     """Показывает меню Вы проиграли!."""
-    font = pygame.font.Font(None, 64)
-    title_text = font.render("Вы проиграли!", True, WHITE)
-    title_rect = title_text.get_rect(center=(width // 2, height // 2 - 50))
-
-    score_font = pygame.font.Font(None, 36)
-    score_text = score_font.render(f"Счет: {score}", True, WHITE)
-    score_rect = score_text.get_rect(center=(width // 2, height // 2))
-
-    button_font = pygame.font.Font(None, 48)
-    button_text = button_font.render("ИГРАТЬ СНОВА", True, WHITE)
-    button_rect = button_text.get_rect(center=(width // 2, height // 2 + 100))
-    button_box = button_rect.inflate(20, 10)
+    # Фон поля постепенно размывается и заливается цветом фона
+    overlay.open(BG_COLOR, 200, blur=True, fade_time=FADE_TIME)
+    overlay.add_text(
+        render_text("Вы проиграли!", 64, WHITE), (width // 2, height // 2 - 50)
+    )
+    overlay.add_text(
+        render_text(f"Счет: {score}", 36, WHITE), (width // 2, height // 2)
+    )
+    button_box = overlay.add_button(
+        render_text("ИГРАТЬ СНОВА", 48, WHITE),
+        (width // 2, height // 2 + 100),
+        BLACK,
+        fill=GRAY,
+    )
+    view.show(SCENE_GAME_OVER, restart=button_box)
 
     while True:
-        s = pygame.Surface((450, 600))
-        s.set_alpha(5)  # прозрачность
-        s.fill(BG_COLOR)
-        screen.blit(s, (0, 0))
-        screen.blit(title_text, title_rect)
-        screen.blit(score_text, score_rect)
-        pygame.draw.rect(screen, GRAY, button_box)  # Кнопка
-        pygame.draw.rect(screen, BLACK, button_box, 2)  # Контур кнопки
-        screen.blit(button_text, button_rect)
-
-        for event in pygame.event.get():
+        # Пока идёт затемнение фона, кадры рисуются с полной частотой
+        fading = overlay.draw()
+        for event in scheduler.events(active=fading):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN and button_box.collidepoint(
                 event.pos
             ):
-                restart_game()  # Перезапуск игры
-
-        pygame.display.flip()
+                return  # Перезапуск игры
 
 
-def show_pause_menu():
-    # Полупрозрачный фон
-    overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 128))  # RGBA: черный с 50% прозрачностью
-    screen.blit(overlay, (0, 0))
+def show_pause_menu(overlay):
+    """Меню паузы; возвращает сцену, в которую нужно перейти."""
+    # Полупрозрачный черный фон поверх кадра игры
+    overlay.open(BLACK, 128, fade_time=PAUSE_FADE_TIME)
 
     # Кнопка возврата в меню
-    menu_button_text = pygame.font.Font(None, 36).render("В главное меню", True, WHITE)
-    menu_button_rect = menu_button_text.get_rect(center=(width // 2, height // 2 + 50))
-    screen.blit(menu_button_text, menu_button_rect)
-    pygame.draw.rect(screen, (150, 150, 150), menu_button_rect.inflate(10, 5), 2)
+    menu_button_box = overlay.add_button(
+        render_text("В главное меню", 36, WHITE),
+        (width // 2, height // 2 + 50),
+        (150, 150, 150),
+        padding=(10, 5),
+    )
 
     # Кнопка продолжить игру
-    continue_button_text = pygame.font.Font(None, 36).render(
-        "Продолжить игру", True, WHITE
-    )
-    continue_button_rect = continue_button_text.get_rect(
-        center=(width // 2, height // 2 - 50)
+    continue_button_box = overlay.add_button(
+        render_text("Продолжить игру", 36, WHITE),
+        (width // 2, height // 2 - 50),
+        (150, 150, 150),
+        padding=(10, 5),
     )
-    screen.blit(continue_button_text, continue_button_rect)
-    pygame.draw.rect(screen, (150, 150, 150), continue_button_rect.inflate(10, 5), 2)
+    view.show(SCENE_PAUSED, menu=menu_button_box, resume=continue_button_box)
 
     while True:
+        fading = overlay.draw()
+
         # Обработка событий в меню
-        for event in pygame.event.get():
+        for event in scheduler.events(active=fading):
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if menu_button_rect.inflate(10, 5).collidepoint(event.pos):
-                    restart_game()
-                if continue_button_rect.inflate(10, 5).collidepoint(event.pos):
-                    return  # Продолжить игру
+                if menu_button_box.collidepoint(event.pos):
+                    return SCENE_START_MENU
+                if continue_button_box.collidepoint(event.pos):
+                    overlay.restore()
+                    return SCENE_PLAYING  # Продолжить игру
             if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
-                return  # Выход из паузы
+                overlay.restore()
+                return SCENE_PLAYING  # Выход из паузы
+
+
+def hint_ghost(game, hints):
+    """Следующий ход из подсказки: (спрайт фигуры, позиция) или None."""
+    if not hints.enabled:
+        return None
+    pids = [block.template_id for block in game.blocks]
+    path = hints.hint(game.board.occupied, pids)
+    if path is None:
+        hints.request(game.board.occupied, pids)
+        return None
+    if not path:
+        return None
+    pid, row, col = path[0]
+    block = next(block for block in game.blocks if block.template_id == pid)
+    position = (
+        game.field_x + col * block_size,
+        game.field_y + row * block_size,
+    )
+    return Block.sprites[(pid, block.color)], position
 
-        pygame.display.update()
 
+def drop_preview(game, block):
+    """Предпросмотр броска блока: (фигура, клетка, можно ли, линии) или None."""
+    preview = game.preview(block)
+    if preview is None:
+        return None
+    valid, cleared = preview
+    return block.template_id, block.snap_cell(), valid, cleared
 
-# Основная функция игры
-def main():
-    clock = pygame.time.Clock()
-    score = 0
-
-    # Показываем стартовое меню при первом запуске игры
-    show_start_menu()
-
-    # Игровое поле
-    field = [[None for _ in range(grid_size)] for _ in range(grid_size)]
-    field_x = (width - (grid_size * block_size)) // 2
-    field_y = 100
-
-    def generate_blocks():
-        blocks = []
-        block_width = (
-            max(len(temp[0]) for template in TEMPLATES for temp in template)
-            * block_size
-        )
-        gap = 20  # расстояние между блоками
-        x = 35
-        templates = list(TEMPLATES)
-        random.shuffle(templates)
-
-        for i in range(3):
-            probability = random.randint(1, 100)
-
-            if score < 1000:
-                print('low level')  #! debug
-                if probability <= 20:
-                    template = random.choice(templates[0])  # Квадраты
-                elif 20 < probability <= 45:
-                    template = random.choice(templates[1])  # Линии
-                elif 45 < probability <= 70:
-                    template = random.choice(templates[2])  # Маленькие уголки
-                elif 70 < probability <= 90:
-                    template = random.choice(templates[3])  # Г-образные
-                else:
-                    template = random.choice(templates[4])  # Большие уголки
-            elif score < 1500:
-                print('mid level')  #! debug
-                if probability <= 10:
-                    template = random.choice(templates[0])  # Квадраты
-                elif 10 < probability <= 30:
-                    template = random.choice(templates[1])  # Линии
-                elif 30 < probability <= 50:
-                    template = random.choice(templates[2])  # Маленькие уголки
-                elif 50 < probability <= 80:
-                    template = random.choice(templates[3])  # Г-образные
-                else:
-                    template = random.choice(templates[4])  # Большие уголки
-            else:
-                print('high level') #! debug
-                if probability <= 5:
-                    template = random.choice(templates[0])  # Квадраты
-                elif 5 < probability <= 20:
-                    template = random.choice(templates[1])  # Линии
-                elif 20 < probability <= 40:
-                    template = random.choice(templates[2])  # Маленькие уголки
-                elif 40 < probability <= 75:
-                    template = random.choice(templates[3])  # Г-образные
-                else:
-                    template = random.choice(templates[4])  # Большие уголки
-
-            block = Block(template, x, height - 150, field_x, field_y)
-            blocks.append(block)
-            x += block_width + gap
-        return blocks
-
-    blocks = generate_blocks()
-
-    def can_place_block(block):
-        """Проверка возможности размещения блока."""
-        for y, x in block.get_cells():
-            if (
-                x < 0
-                or y < 0
-                or x >= grid_size
-                or y >= grid_size
-                or field[y][x] is not None
-            ):
-                return False
-        return True
-
-    def is_game_over():
-        """Проверяет, возможен ли ход."""
-        for block in blocks:
-            for row_shift in range(grid_size - len(block.template) + 1):
-                for col_shift in range(grid_size - len(block.template[0]) + 1):
-                    temp_block = Block(block.template, 0, 0, field_x, field_y)
-                    temp_block.move(
-                        field_x + col_shift * block_size,
-                        field_y + row_shift * block_size,
-                    )
-                    if can_place_block(temp_block):
-                        return False
-        return True
-
-    def place_block(block):
-        """Размещение блока на поле."""
-        nonlocal score
-        for y, x in block.get_cells():
-            field[y][x] = block.color
-        score += sum(sum(row) for row in block.template)
-
-    def clear_lines():
-        """Очистка заполненных строк и столбцов с увеличением очков за несколько линий."""
-        nonlocal score
-        rows_to_clear = []
-        cols_to_clear = []
-
-        for row in range(grid_size):
-            if all(field[row][col] is not None for col in range(grid_size)):
-                rows_to_clear.append(row)
-
-        for col in range(grid_size):
-            if all(field[row][col] is not None for row in range(grid_size)):
-                cols_to_clear.append(col)
-
-        for row in rows_to_clear:
-            for col in range(grid_size):
-                field[row][col] = None
-
-        for col in cols_to_clear:
-            for row in range(grid_size):
-                field[row][col] = None
-
-        # Подсчет очков с увеличением за комбо
-        lines_cleared = len(rows_to_clear) + len(cols_to_clear)
-        if lines_cleared > 1:
-            score += lines_cleared * (grid_size * 5 + 10)
-        else:
-            score += grid_size * 3 + 5
 
-    running = True
-    paused = False
-    while running:
-        global offset_x, offset_y
-
-        for event in pygame.event.get():
+def play(game, renderer, hints, history, autosaver):
+    """Игровой цикл; возвращает сцену, в которую нужно перейти."""
+    offset_x = offset_y = 0
+    # Блок и клетка, для которых показан предпросмотр
+    preview_key = None
+    last_frame = time.perf_counter()
+    view.show(SCENE_PLAYING, game, pause=renderer.pause_button_box)
+    while True:
+        blocks = game.blocks
+        # Частые кадры нужны только при перетаскивании или ожидающей перерисовке
+        active = renderer.full_redraw or any(block.dragging for block in blocks)
+        events = scheduler.events(active)
+        now = time.perf_counter()
+        game.play_time += now - last_frame  # Время партии без пауз и меню
+        last_frame = now
+        profiler.begin_frame()
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
 
             if event.type == pygame.MOUSEBUTTONDOWN:
+                # Проверяем нажатие кнопки паузы
+                if renderer.pause_button_box.collidepoint(event.pos):
+                    return SCENE_PAUSED
                 for block in blocks:
                     mouse_x, mouse_y = event.pos
                     if pygame.Rect(
@@ -437,6 +312,7 @@ def main():
                         len(block.template) * block_size,
                     ).collidepoint(event.pos):
                         block.dragging = True
+                        renderer.invalidate()
                         offset_x = mouse_x - block.position[0]
                         offset_y = mouse_y - block.position[1]
 
@@ -444,15 +320,39 @@ def main():
                 for block in blocks:
                     if block.dragging:
                         block.dragging = False
-                        block.snap_to_grid()
-                        if can_place_block(block):
-                            place_block(block)
-                            clear_lines()
-                            blocks.remove(block)
-                            if not blocks:
-                                blocks = generate_blocks()
-                        else:
-                            block.reset_position()
+                        renderer.invalidate()
+                        before = snapshot.capture(game, moves=False)
+                        if game.drop_block(block):
+                            history.push(before)
+                            autosaver.save(snapshot.capture(game))
+                            renderer.sync_cells()
+                        break
+
+            # Ctrl+Z — отменить ход, Ctrl+Y или Ctrl+Shift+Z — повторить
+            if event.type == pygame.KEYDOWN and event.mod & pygame.KMOD_CTRL:
+                changed = False
+                if event.key == pygame.K_z and not event.mod & pygame.KMOD_SHIFT:
+                    changed = history.undo(game)
+                elif event.key in (pygame.K_y, pygame.K_z):
+                    changed = history.redo(game)
+                if changed:
+                    autosaver.save(snapshot.capture(game))
+                    renderer.sync_cells()
+                    blocks = game.blocks
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                hints.enabled = not hints.enabled  # Подсказка вкл/выкл
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()  # Оверлей времени кадра
+                renderer.invalidate()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                # Трасса для chrome://tracing; без записи в data игра продолжается
+                try:
+                    count = profiler.export_trace(trace_path)
+                    profiler.note(f"трасса сохранена: {count} событий")
+                except OSError:
+                    profiler.note("трасса не сохранена")
+                renderer.invalidate()
 
             if event.type == pygame.MOUSEMOTION:
                 for block in blocks:
@@ -462,59 +362,94 @@ def main():
                         square_y = mouse_y - offset_y
                         block.move(square_x, square_y)
 
-        # Проверяем проигрыш с последующей записью рекордов
-        if is_game_over():
-            with open(records_path, "r") as file:
-                records = list(map(int, file.readline().split()))
-                print(records)
-                records.append(score)
-                records.sort(reverse=True)
-                print(records)
-            with open(records_path, "w") as file:
-                file.write(" ".join(list(map(str, records))[:-1]))
-            show_game_over_menu(score)
+        # Событий движения мыши может быть много за кадр, а предпросмотр
+        # меняется только вместе с клеткой под блоком
+        dragged = next((block for block in game.blocks if block.dragging), None)
+        key = (dragged, dragged.snap_cell()) if dragged else None
+        if key != preview_key:
+            preview_key = key
+            renderer.set_preview(drop_preview(game, dragged) if dragged else None)
+        profiler.mark(EVENTS)
 
-        screen.fill(BG_COLOR)
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Счет: {score}", True, WHITE)
-        screen.blit(score_text, (10, 10))
-
-        # Отрисовка кнопки паузы поверх игрового поля
-
-        pause_button_font = pygame.font.Font(None, 24)
-        pause_button_text = pause_button_font.render("Настройки", True, WHITE)
-        pause_button_rect = pause_button_text.get_rect(topright=(width - 10, 10))
-        pause_button_box = pause_button_rect.inflate(10, 10)
-        screen.blit(pause_button_text, pause_button_rect)
-        line = pygame.draw.rect(screen, GRAY, pause_button_box, 2)  # Контур кнопки
-
-        # Проверяем нажатие кнопки паузы
-        if pygame.mouse.get_pressed()[0] and pause_button_box.collidepoint(
-            pygame.mouse.get_pos()
-        ):
-            paused = not paused
-            if paused:
-                show_pause_menu()
-            else:
-                continue
-
-        for row in range(grid_size):
-            for col in range(grid_size):
-                x = field_x + col * block_size
-                y = field_y + row * block_size
-                pygame.draw.rect(screen, GRAY, (x, y, block_size, block_size))
-                pygame.draw.rect(screen, BLACK, (x, y, block_size, block_size), 2)
-                if field[row][col]:
-                    pygame.draw.rect(
-                        screen, field[row][col], (x, y, block_size, block_size)
-                    )
-                    pygame.draw.rect(screen, BLACK, (x, y, block_size, block_size), 2)
-
-        for block in blocks:
-            block.draw()
+        # Проверяем проигрыш
+        if game.is_game_over():
+            return SCENE_GAME_OVER
+        profiler.mark(GAME_OVER)
+
+        renderer.set_hint(hint_ghost(game, hints))
+        renderer.draw(game.score, game.blocks)
+        profiler.end_frame()
+
+
+# Основная функция игры
+def main():
+    """Единый цикл сцен: одна партия и один набор поверхностей на всю сессию."""
+    game = Game()
+    renderer = BoardRenderer(
+        screen, game.board, game.field_x, game.field_y, profiler=profiler
+    )
+    # Подсказка считается в фоне; готовый результат будит игровой цикл
+    hints = HintWorker(
+        game.board.size,
+        on_ready=lambda: post_event(HINT_READY),
+    )
+    # Рекорды и история партий
+    scores = ScoreStore(
+        scores_path,
+        legacy_path=records_path,
+        on_change=lambda: post_event(SCORES_READY),
+    )
+
+    # Меню паузы и проигрыша поверх кадра игры
+    overlay = Overlay(screen)
+
+    # Отмена ходов и автосохранение после каждого хода
+    history = snapshot.History()
+    autosaver = snapshot.Autosaver(autosave_path)
+    atexit.register(autosaver.flush)
+    # Запись последней партии тоже пишется в фоне
+    last_game = snapshot.Autosaver(replay_path)
+    atexit.register(last_game.flush)
+
+    # Незаконченная партия с прошлого запуска продолжается
+    resume = False
+    saved = snapshot.load(autosave_path)
+    if saved is not None:
+        try:
+            snapshot.restore(game, saved)
+            resume = True
+        except snapshot.SnapshotError:
+            pass
+
+    scene = SCENE_START_MENU
+    while True:
+        if scene == SCENE_START_MENU:
+            # Показываем стартовое меню и начинаем новую партию
+            show_start_menu(scores, resume)
+            if not resume:
+                game.reset()
+                history.clear()
+            resume = False
+            renderer.sync_cells()
+            scene = SCENE_PLAYING
+        elif scene == SCENE_PLAYING:
+            scene = play(game, renderer, hints, history, autosaver)
+        elif scene == SCENE_PAUSED:
+            # Продолжение игры выводит сохранённый кадр, поле не перерисовывается
+            scene = show_pause_menu(overlay)
+        elif scene == SCENE_GAME_OVER:
+            # Рекорды и запись последней партии для отчётов об ошибках (в фоне)
+            scores.record(game)
+            last_game.save(replay.dumps(game))
+            autosaver.discard()
+            history.clear()
+            # Итоговое поле попадает на экран до затемнения
+            renderer.draw(game.score, game.blocks)
+            show_game_over_menu(overlay, game.score)
+            scene = SCENE_START_MENU
 
-        pygame.display.flip()
-        clock.tick(144)
 
 if __name__ == "__main__":
+    report_startup = "--startup-time" in sys.argv[1:]
+    init_display()
     main()
@@ -0,0 +1,105 @@
+"""Меню поверх остановленного кадра игры (пауза, проигрыш).
+
+При открытии меню кадр игры копируется один раз, из него один раз
+собирается размытый и затемнённый фон, а надписи и кнопки рисуются на
+отдельный прозрачный слой. Появление меню — анимация по времени: в
+каждом кадре меняется только прозрачность готовых слоёв, новые
+поверхности не создаются. Все поверхности создаются один раз на окно.
+После закрытия меню игра возвращается сохранённым кадром, без
+перерисовки поля.
+"""
+
+import time
+
+import pygame
+
+BLUR_SCALE = 4  # во сколько раз уменьшается кадр для размытия
+
+
+class Overlay:
+    def __init__(self, screen):
+        self.screen = screen
+        size = screen.get_size()
+        # Кадр игры, размытый и затемнённый фон, слой надписей и кнопок
+        self.frame = pygame.Surface(size).convert()
+        self.backdrop = pygame.Surface(size).convert()
+        self.widgets = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        self._small = pygame.Surface(
+            (max(1, size[0] // BLUR_SCALE), max(1, size[1] // BLUR_SCALE))
+        ).convert()
+        self._tint = pygame.Surface(size).convert()
+        self._fade_start = 0.0
+        self._fade_time = 0.0
+        self._shown = False
+
+    def open(self, color, alpha, blur=False, fade_time=0):
+        """Запоминает текущий кадр и готовит фон: цвет color с прозрачностью alpha.
+
+        fade_time — длительность появления меню, мс.
+        """
+        self.frame.blit(self.screen, (0, 0))
+        if blur:
+            pygame.transform.smoothscale(
+                self.frame, self._small.get_size(), self._small
+            )
+            pygame.transform.smoothscale(
+                self._small, self.backdrop.get_size(), self.backdrop
+            )
+        else:
+            self.backdrop.blit(self.frame, (0, 0))
+        self._tint.fill(color)
+        self._tint.set_alpha(alpha)
+        self.backdrop.blit(self._tint, (0, 0))
+        self.backdrop.set_alpha(255)
+        self.widgets.fill((0, 0, 0, 0))
+        self.widgets.set_alpha(255)
+
+        self._fade_start = time.perf_counter()
+        self._fade_time = fade_time / 1000
+        self._shown = False
+
+    def add_text(self, text, center):
+        """Надпись на слое меню; возвращает её прямоугольник."""
+        rect = text.get_rect(center=center)
+        self.widgets.blit(text, rect)
+        return rect
+
+    def add_button(self, text, center, border, fill=None, padding=(20, 10)):
+        """Кнопка на слое меню; возвращает прямоугольник для нажатий."""
+        rect = text.get_rect(center=center)
+        box = rect.inflate(*padding)
+        if fill is not None:
+            pygame.draw.rect(self.widgets, fill, box)
+        pygame.draw.rect(self.widgets, border, box, 2)  # Контур кнопки
+        self.widgets.blit(text, rect)
+        return box
+
+    def draw(self):
+        """Выводит меню; возвращает True, пока идёт появление.
+
+        Когда появление закончилось, экран не перерисовывается.
+        """
+        if self._shown:
+            return False
+        screen = self.screen
+        elapsed = time.perf_counter() - self._fade_start
+        if elapsed < self._fade_time:
+            alpha = int(255 * elapsed / self._fade_time)
+            screen.blit(self.frame, (0, 0))
+            self.backdrop.set_alpha(alpha)
+            self.widgets.set_alpha(alpha)
+            fading = True
+        else:
+            self.backdrop.set_alpha(255)
+            self.widgets.set_alpha(255)
+            self._shown = True
+            fading = False
+        screen.blit(self.backdrop, (0, 0))
+        screen.blit(self.widgets, (0, 0))
+        pygame.display.flip()
+        return fading
+
+    def restore(self):
+        """Возвращает на экран кадр игры, сохранённый при открытии меню."""
+        self.screen.blit(self.frame, (0, 0))
+        pygame.display.flip()
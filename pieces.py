@@ -0,0 +1,103 @@
+"""Выдача фигур по таблицам вероятностей уровней сложности.
+
+Уровни сложности (порог счёта и веса групп шаблонов) читаются из
+data/difficulty.json, поэтому кривую сложности можно менять без правки
+кода. Для каждого уровня один раз строится таблица псевдонимов (alias
+method), и выбор фигуры стоит O(1): одно случайное число на индекс и
+одно на сравнение.
+"""
+
+import json
+import os
+
+from engine import PIECES, TEMPLATES
+
+# Названия групп шаблонов в порядке TEMPLATES
+GROUP_NAMES = ("squares", "lines", "small_corners", "l_shapes", "big_corners")
+
+DIFFICULTY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "difficulty.json"
+)
+
+# Группа каждой фигуры из PIECES
+PIECE_GROUPS = [group for group, templates in enumerate(TEMPLATES) for _ in templates]
+
+
+class AliasTable:
+    """Выбор индекса с заданными весами за O(1) (метод Уолкера/Воуза)."""
+
+    def __init__(self, weights):
+        count = len(weights)
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("сумма весов должна быть положительной")
+        scaled = [weight * count / total for weight in weights]
+        self.prob = [0.0] * count
+        self.alias = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        for index in small + large:
+            self.prob[index] = 1.0
+
+    def sample(self, rng):
+        index = int(rng.random() * len(self.prob))
+        return index if rng.random() < self.prob[index] else self.alias[index]
+
+
+class Tier:
+    """Уровень сложности: до какого счёта действует и веса фигур."""
+
+    def __init__(self, name, max_score, group_weights):
+        self.name = name
+        self.max_score = max_score
+        # Вес группы делится поровну между её фигурами
+        self.piece_weights = [
+            group_weights[PIECE_GROUPS[pid]] / len(TEMPLATES[PIECE_GROUPS[pid]])
+            for pid in range(len(PIECES))
+        ]
+        self.table = AliasTable(self.piece_weights)
+
+    def sample(self, rng):
+        """Идентификатор случайной фигуры."""
+        return self.table.sample(rng)
+
+
+def load_tiers(path=DIFFICULTY_PATH):
+    """Читает уровни сложности из JSON-файла."""
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    tiers = []
+    for entry in data["tiers"]:
+        weights = entry["weights"]
+        unknown = set(weights) - set(GROUP_NAMES)
+        if unknown:
+            raise ValueError(
+                f"неизвестные группы шаблонов: {', '.join(sorted(unknown))}"
+            )
+        tiers.append(
+            Tier(
+                entry["name"],
+                entry.get("max_score"),
+                [weights.get(name, 0) for name in GROUP_NAMES],
+            )
+        )
+    if not tiers or tiers[-1].max_score is not None:
+        raise ValueError("последний уровень должен быть без порога (max_score: null)")
+    return tiers
+
+
+TIERS = load_tiers()
+
+
+def difficulty_tier(score, tiers=TIERS):
+    """Уровень сложности для текущего счёта."""
+    for tier in tiers:
+        if tier.max_score is None or score < tier.max_score:
+            return tier
+    return tiers[-1]
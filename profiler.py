@@ -0,0 +1,174 @@
+"""Замер времени фаз кадра с оверлеем в игре и выгрузкой в Chrome trace.
+
+Последние кадры хранятся в кольцевом буфере. Пока профилировщик
+выключен, begin_frame/mark/end_frame подменены пустой функцией, так что
+вызовы в игровом цикле почти ничего не стоят.
+
+F3 — показать/скрыть оверлей (и включить замеры), F4 — сохранить трассу
+в data/frame_trace.json; её можно открыть в chrome://tracing или Perfetto.
+"""
+
+import json
+import time
+
+import pygame
+
+from fonts import get_font
+
+# Фазы кадра в порядке выполнения
+EVENTS, GAME_OVER, BOARD, HUD, BLOCKS, FLIP = range(6)
+PHASES = ("events", "game_over", "board", "hud", "blocks", "flip")
+
+OVERLAY_POS = (10, 45)
+OVERLAY_REFRESH = 0.25  # как часто обновлять текст оверлея, с
+
+
+def _noop(*args):
+    pass
+
+
+class FrameProfiler:
+    def __init__(self, frames=600, scheduler=None):
+        self.size = frames
+        # FrameScheduler, чья частота кадров показывается в оверлее
+        self.scheduler = scheduler
+        self._starts = [0.0] * frames
+        self._phases = [[0.0] * len(PHASES) for _ in range(frames)]
+        self._index = 0
+        self._count = 0
+        self._last = 0.0
+        self._overlay = None
+        self._overlay_time = 0.0
+        self._message = None  # последняя строка оверлея (см. note)
+        self.set_enabled(False)
+
+    def set_enabled(self, enabled):
+        """Включает замеры и оверлей; выключенный профилировщик ничего не делает."""
+        self.enabled = enabled
+        if enabled:
+            self.begin_frame = self._begin_frame
+            self.mark = self._mark
+            self.end_frame = self._end_frame
+            # Включение посреди кадра: отсчёт начинается с этого момента
+            self._begin_frame()
+        else:
+            self.begin_frame = self.mark = self.end_frame = _noop
+            self._overlay = None
+
+    def toggle(self):
+        self.set_enabled(not self.enabled)
+
+    def note(self, message):
+        """Показывает сообщение последней строкой оверлея."""
+        self._message = message
+        self._overlay = None
+
+    def _begin_frame(self):
+        self._last = now = time.perf_counter()
+        self._starts[self._index] = now
+        phases = self._phases[self._index]
+        for phase in range(len(phases)):
+            phases[phase] = 0.0
+
+    def _mark(self, phase):
+        """Добавляет время с предыдущей отметки к фазе phase."""
+        now = time.perf_counter()
+        self._phases[self._index][phase] += now - self._last
+        self._last = now
+
+    def _end_frame(self):
+        self._index = (self._index + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def frames(self):
+        """Записанные кадры от старых к новым: (начало, длительности фаз)."""
+        start = (self._index - self._count) % self.size
+        for offset in range(self._count):
+            index = (start + offset) % self.size
+            yield self._starts[index], self._phases[index]
+
+    def stats(self):
+        """Время кадра (последнего, p50, p99) и самая медленная фаза, в мс."""
+        totals = sorted(sum(phases) for _, phases in self.frames())
+        if not totals:
+            return None
+        last = sum(self._phases[(self._index - 1) % self.size])
+        slowest = [0.0] * len(PHASES)
+        for _, phases in self.frames():
+            for phase, duration in enumerate(phases):
+                slowest[phase] = max(slowest[phase], duration)
+        worst = max(range(len(PHASES)), key=slowest.__getitem__)
+        return {
+            "last": last * 1000,
+            "p50": totals[len(totals) // 2] * 1000,
+            "p99": totals[min(len(totals) - 1, int(len(totals) * 0.99))] * 1000,
+            "slowest_phase": PHASES[worst],
+            "slowest_ms": slowest[worst] * 1000,
+        }
+
+    def overlay(self, color):
+        """Поверхность с текстом оверлея; перерисовывается не чаще OVERLAY_REFRESH."""
+        now = time.perf_counter()
+        if self._overlay is None or now - self._overlay_time > OVERLAY_REFRESH:
+            stats = self.stats()
+            font = get_font(20)
+            if stats is None:
+                lines = ["нет данных"]
+            else:
+                lines = [
+                    "кадр {last:.2f} мс  p50 {p50:.2f}  p99 {p99:.2f}".format(**stats),
+                    "медленнее всего: {slowest_phase} {slowest_ms:.2f} мс".format(
+                        **stats
+                    ),
+                ]
+            if self.scheduler is not None:
+                lines.append(f"частота {self.scheduler.get_fps():.0f} кадров/с")
+            if self._message is not None:
+                lines.append(self._message)
+            rendered = [font.render(line, True, color) for line in lines]
+            surface = pygame.Surface(
+                (
+                    max(text.get_width() for text in rendered),
+                    sum(text.get_height() for text in rendered),
+                ),
+                pygame.SRCALPHA,
+            )
+            y = 0
+            for text in rendered:
+                surface.blit(text, (0, y))
+                y += text.get_height()
+            self._overlay = surface
+            self._overlay_time = now
+        return self._overlay
+
+    def export_trace(self, path):
+        """Сохраняет записанные кадры в формате Chrome trace (JSON)."""
+        events = []
+        for start, phases in self.frames():
+            ts = start * 1e6
+            events.append(
+                {
+                    "name": "frame",
+                    "ph": "X",
+                    "ts": ts,
+                    "dur": sum(phases) * 1e6,
+                    "pid": 1,
+                    "tid": 1,
+                }
+            )
+            for phase, duration in enumerate(phases):
+                if duration:
+                    events.append(
+                        {
+                            "name": PHASES[phase],
+                            "ph": "X",
+                            "ts": ts,
+                            "dur": duration * 1e6,
+                            "pid": 1,
+                            "tid": 1,
+                        }
+                    )
+                    ts += duration * 1e6
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        return len(events)
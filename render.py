@@ -0,0 +1,279 @@
+"""Отрисовка игрового экрана с обновлением только изменившихся областей.
+
+Кадр собирается из трёх слоёв:
+- фон с пустой сеткой рисуется один раз;
+- слой занятых клеток обновляется только после place_block/clear_lines;
+- во время перетаскивания перерисовываются лишь старый и новый
+  прямоугольники блока через ``pygame.display.update(rects)``.
+
+Предпросмотр броска (куда встанет блок и какие линии очистятся) входит
+в собранный кадр и меняется только при смене клетки под блоком.
+"""
+
+import pygame
+
+from engine import PIECES, iter_bits
+from fonts import render_text
+from profiler import BLOCKS, BOARD, FLIP, HUD, OVERLAY_POS, FrameProfiler
+from settings import (
+    BG_COLOR,
+    BLACK,
+    CLEAR_HIGHLIGHT,
+    GRAY,
+    HINT_ALPHA,
+    PREVIEW_ALPHA,
+    PREVIEW_BAD_COLOR,
+    PREVIEW_OK_COLOR,
+    SHADOW_COLOR,
+    SHADOW_OFFSET,
+    WHITE,
+    block_colors,
+    block_size,
+)
+
+
+def draw_cell(surface, x, y, color):
+    """Клетка поля: заливка и контур."""
+    pygame.draw.rect(surface, color, (x, y, block_size, block_size))
+    pygame.draw.rect(surface, BLACK, (x, y, block_size, block_size), 2)
+
+
+def render_piece(template, color):
+    """Спрайт фигуры с полупрозрачной тенью; требует открытого окна."""
+    sprite = pygame.Surface(
+        (
+            len(template[0]) * block_size + SHADOW_OFFSET,
+            len(template) * block_size + SHADOW_OFFSET,
+        ),
+        pygame.SRCALPHA,
+    )
+    cells = [
+        pygame.Rect(col_idx * block_size, row_idx * block_size, block_size, block_size)
+        for row_idx, row in enumerate(template)
+        for col_idx, cell in enumerate(row)
+        if cell
+    ]
+    # Сначала все тени, чтобы они не перекрывали соседние клетки
+    for rect in cells:
+        pygame.draw.rect(sprite, SHADOW_COLOR, rect.move(SHADOW_OFFSET, SHADOW_OFFSET))
+    for rect in cells:
+        pygame.draw.rect(sprite, color, rect)
+        pygame.draw.rect(sprite, BLACK, rect, 2)  # Контур блока
+    return sprite.convert_alpha()
+
+
+def render_ghost(template, color):
+    """Полупрозрачный контур фигуры без тени для предпросмотра на поле."""
+    sprite = pygame.Surface(
+        (len(template[0]) * block_size, len(template) * block_size), pygame.SRCALPHA
+    )
+    for row_idx, row in enumerate(template):
+        for col_idx, cell in enumerate(row):
+            if cell:
+                rect = (
+                    col_idx * block_size,
+                    row_idx * block_size,
+                    block_size,
+                    block_size,
+                )
+                pygame.draw.rect(sprite, color + (PREVIEW_ALPHA,), rect)
+                pygame.draw.rect(sprite, BLACK + (PREVIEW_ALPHA,), rect, 2)
+    return sprite
+
+
+class PieceSprites(dict):
+    """Кэш спрайтов по ключу (идентификатор фигуры, цвет).
+
+    Спрайт рисуется при первом обращении, поэтому запуск игры не ждёт
+    отрисовки всех пар фигура-цвет.
+    """
+
+    def __missing__(self, key):
+        pid, color = key
+        sprite = self[key] = render_piece(PIECES[pid], color)
+        return sprite
+
+
+def build_piece_sprites(colors):
+    """Заранее рисует спрайты для всех пар (фигура, цвет)."""
+    sprites = PieceSprites()
+    for pid in range(len(PIECES)):
+        for color in colors:
+            sprites[(pid, color)]
+    return sprites
+
+
+class BoardRenderer:
+    def __init__(self, screen, board, field_x, field_y, profiler=None):
+        self.screen = screen
+        self.board = board
+        # Замер фаз кадра; по умолчанию выключенный профилировщик
+        self.profiler = profiler or FrameProfiler()
+        side = board.size * block_size
+        self.field_rect = pygame.Rect(field_x, field_y, side, side)
+
+        # Фон с пустой сеткой
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(BG_COLOR)
+        for row in range(board.size):
+            for col in range(board.size):
+                draw_cell(
+                    self.background,
+                    field_x + col * block_size,
+                    field_y + row * block_size,
+                    GRAY,
+                )
+
+        # Слой клеток поля и цвета, которые в нём сейчас нарисованы
+        self.cells = self.background.subsurface(self.field_rect).copy()
+        self._drawn = [None] * (board.size * board.size)
+
+        # Собранный кадр без перетаскиваемого блока
+        self.frame = self.background.copy()
+        self.full_redraw = True
+        self._drag_rect = None
+
+        # Подсказка: (спрайт фигуры, позиция) и полупрозрачные копии спрайтов
+        self.hint = None
+        self._ghosts = {}
+        self._overlay_rect = None
+
+        # Предпросмотр броска: (фигура, клетка, можно ли, маска очищаемых линий)
+        self.preview = None
+        self._preview_ghosts = {}
+        self._highlight = pygame.Surface((block_size, block_size), pygame.SRCALPHA)
+        self._highlight.fill(CLEAR_HIGHLIGHT)
+
+        # Кнопка паузы
+        self.pause_button_text = render_text("Настройки", 24, WHITE)
+        self.pause_button_rect = self.pause_button_text.get_rect(
+            topright=(screen.get_width() - 10, 10)
+        )
+        self.pause_button_box = self.pause_button_rect.inflate(10, 10)
+
+    def invalidate(self):
+        """Следующий кадр будет собран и выведен целиком."""
+        self.full_redraw = True
+
+    def set_hint(self, hint):
+        """Показывает подсказку — (спрайт фигуры, позиция) — или убирает её (None)."""
+        if hint != self.hint:
+            self.hint = hint
+            self.full_redraw = True
+
+    def set_preview(self, preview):
+        """Показывает предпросмотр броска или убирает его (None)."""
+        if preview != self.preview:
+            self.preview = preview
+            self.full_redraw = True
+
+    def _preview_ghost(self, pid, valid):
+        key = (pid, valid)
+        ghost = self._preview_ghosts.get(key)
+        if ghost is None:
+            color = PREVIEW_OK_COLOR if valid else PREVIEW_BAD_COLOR
+            ghost = self._preview_ghosts[key] = render_ghost(PIECES[pid], color)
+        return ghost
+
+    def _draw_preview(self, frame):
+        pid, (row, col), valid, cleared = self.preview
+        x, y = self.field_rect.topleft
+        size = self.board.size
+        for index in iter_bits(cleared):
+            cell_row, cell_col = divmod(index, size)
+            frame.blit(
+                self._highlight, (x + cell_col * block_size, y + cell_row * block_size)
+            )
+        frame.blit(
+            self._preview_ghost(pid, valid),
+            (x + col * block_size, y + row * block_size),
+        )
+
+    def _ghost(self, sprite):
+        ghost = self._ghosts.get(sprite)
+        if ghost is None:
+            ghost = self._ghosts[sprite] = sprite.copy()
+            ghost.set_alpha(HINT_ALPHA)
+        return ghost
+
+    def sync_cells(self):
+        """Перерисовывает в слое клеток только изменившиеся клетки."""
+        size = self.board.size
+        drawn = self._drawn
+        for index, color in enumerate(self.board.colors):
+            if color != drawn[index]:
+                row, col = divmod(index, size)
+                x, y = col * block_size, row * block_size
+                draw_cell(self.cells, x, y, block_colors[color - 1] if color else GRAY)
+                drawn[index] = color
+        self.full_redraw = True
+
+    def compose(self, score, blocks):
+        """Собирает статичную часть кадра: фон, клетки, счёт и блоки в лотке."""
+        frame = self.frame
+        mark = self.profiler.mark
+        frame.blit(self.background, (0, 0))
+        frame.blit(self.cells, self.field_rect)
+        if self.hint:
+            sprite, position = self.hint
+            frame.blit(self._ghost(sprite), position)
+        if self.preview:
+            self._draw_preview(frame)
+        mark(BOARD)
+
+        score_text = render_text(f"Счет: {score}", 36, WHITE)
+        frame.blit(score_text, (10, 10))
+
+        # Отрисовка кнопки паузы поверх игрового поля
+        frame.blit(self.pause_button_text, self.pause_button_rect)
+        pygame.draw.rect(frame, GRAY, self.pause_button_box, 2)  # Контур кнопки
+        mark(HUD)
+
+        for block in blocks:
+            if not block.dragging:
+                block.draw(frame)
+
+    def draw(self, score, blocks):
+        """Выводит кадр, обновляя только изменившиеся области экрана."""
+        dragged = next((block for block in blocks if block.dragging), None)
+        profiler = self.profiler
+        overlay = profiler.overlay(WHITE) if profiler.enabled else None
+
+        if self.full_redraw:
+            self.compose(score, blocks)
+            self.screen.blit(self.frame, (0, 0))
+            if dragged:
+                dragged.draw(self.screen)
+            self._drag_rect = dragged.rect() if dragged else None
+            if overlay:
+                self.screen.blit(overlay, OVERLAY_POS)
+                self._overlay_rect = overlay.get_rect(topleft=OVERLAY_POS)
+            profiler.mark(BLOCKS)
+            pygame.display.flip()
+            profiler.mark(FLIP)
+            self.full_redraw = False
+            return
+
+        if dragged is None:
+            return
+        rect = dragged.rect()
+        if rect == self._drag_rect:
+            return
+        old_rect = self._drag_rect or rect
+        rects = [old_rect, rect]
+        self.screen.blit(self.frame, old_rect, old_rect)
+        if overlay:
+            # Текст оверлея меняет ширину, поэтому стирается и прошлая область
+            overlay_rect = overlay.get_rect(topleft=OVERLAY_POS)
+            if self._overlay_rect:
+                overlay_rect.union_ip(self._overlay_rect)
+            self._overlay_rect = overlay.get_rect(topleft=OVERLAY_POS)
+            self.screen.blit(self.frame, overlay_rect, overlay_rect)
+            rects.append(overlay_rect)
+        dragged.draw(self.screen)
+        if overlay:
+            self.screen.blit(overlay, OVERLAY_POS)
+        profiler.mark(BLOCKS)
+        pygame.display.update(rects)
+        profiler.mark(FLIP)
+        self._drag_rect = rect
@@ -0,0 +1,119 @@
+"""Компактная запись партий и быстрое повторное проигрывание без окна.
+
+Формат файла (little-endian):
+    заголовок  "BBR" + версия (1 байт), размер поля (1 байт), флаги (1 байт),
+               seed (8 байт), итоговый счёт (4 байта), число ходов (4 байта)
+    флаги      бит 0 — режим guaranteed_playable
+    ходы       по 3 байта: место блока в лотке, строка, столбец
+
+Партия восстанавливается из seed и ходов теми же Game.drop_block и
+Board.clear_lines, что и в игре, поэтому запись можно приложить к отчёту
+об ошибке или прогнать тысячи записей как регрессионный набор:
+
+    python replay.py data/last_game.bbr
+"""
+
+import argparse
+import struct
+import sys
+import time
+
+from game import Game
+
+MAGIC = b"BBR"
+VERSION = 2
+_HEADER = struct.Struct("<3sBBBQII")
+FLAG_GUARANTEED_PLAYABLE = 1
+_MOVE = struct.Struct("<BBB")
+
+
+class ReplayError(Exception):
+    """Запись повреждена или не совпадает с правилами игры."""
+
+
+def encode(seed, moves, score, size=8, flags=0):
+    """Упаковывает партию в байты."""
+    header = _HEADER.pack(MAGIC, VERSION, size, flags, seed, score, len(moves))
+    return header + b"".join(_MOVE.pack(*move) for move in moves)
+
+
+def decode(data):
+    """Распаковывает партию: (seed, ходы, счёт, размер поля, флаги)."""
+    if len(data) < _HEADER.size:
+        raise ReplayError("файл слишком короткий")
+    magic, version, size, flags, seed, score, count = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ReplayError("неизвестный формат записи")
+    if len(data) != _HEADER.size + count * _MOVE.size:
+        raise ReplayError("длина записи не совпадает с числом ходов")
+    moves = [
+        _MOVE.unpack_from(data, _HEADER.size + index * _MOVE.size)
+        for index in range(count)
+    ]
+    return seed, moves, score, size, flags
+
+
+def dumps(game):
+    """Запись партии game в байтах."""
+    flags = FLAG_GUARANTEED_PLAYABLE if game.guaranteed_playable else 0
+    return encode(game.seed, game.moves, game.score, game.board.size, flags)
+
+
+def load(path):
+    with open(path, "rb") as file:
+        return decode(file.read())
+
+
+def simulate(seed, moves, size=8, flags=0):
+    """Повторяет партию без окна и возвращает объект Game в конечном состоянии."""
+    if size < 1:
+        raise ReplayError("неверный размер поля")
+    game = Game(
+        seed=seed,
+        guaranteed_playable=bool(flags & FLAG_GUARANTEED_PLAYABLE),
+        size=size,
+    )
+    for number, (slot, row, col) in enumerate(moves):
+        block = next((b for b in game.blocks if b.slot == slot), None)
+        if block is None:
+            raise ReplayError(f"ход {number}: в лотке нет блока {slot}")
+        block.move_to_cell(row, col)
+        if not game.drop_block(block):
+            raise ReplayError(f"ход {number}: блок нельзя поставить в ({row}, {col})")
+    return game
+
+
+def verify(path):
+    """Проигрывает запись и сверяет итоговый счёт; возвращает объект Game."""
+    seed, moves, score, size, flags = load(path)
+    game = simulate(seed, moves, size, flags)
+    if game.score != score:
+        raise ReplayError(f"счёт {game.score}, в записи {score}")
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка записей партий")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    failed = 0
+    start = time.perf_counter()
+    for path in args.paths:
+        try:
+            game = verify(path)
+        except (OSError, ReplayError) as error:
+            failed += 1
+            print(f"{path}: ОШИБКА {error}")
+        else:
+            print(
+                f"{path}: seed {game.seed}, ходов {len(game.moves)}, "
+                f"счёт {game.score}"
+            )
+    elapsed = time.perf_counter() - start
+    print(f"записей: {len(args.paths)}, ошибок: {failed}, {elapsed:.2f} с")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Таблица рекордов и история партий в SQLite.
+
+Все обращения к базе идут из одного фонового потока: открытие, перенос
+старых рекордов из records.txt, запись законченных партий (каждая —
+отдельная транзакция) и чтение лучших результатов. Игра видит только
+кэш лучших результатов в памяти, поэтому ни меню, ни переход к экрану
+проигрыша не ждут диска.
+
+База открывается в режиме WAL: несколько запущенных копий игры пишут
+в неё одновременно, а оборванная запись откатывается целиком.
+
+Последние партии можно посмотреть без игры (база открывается только
+для чтения):
+
+    python scores.py data/scores.db
+"""
+
+import argparse
+import atexit
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+
+from settings import grid_size
+
+TOP_SIZE = 3  # сколько лучших результатов показывать в меню
+BUSY_TIMEOUT = 5000  # сколько мс ждать блокировку другой копии игры
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    lines INTEGER,
+    duration REAL,
+    moves INTEGER,
+    seed INTEGER,
+    size INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_top ON games (size, score DESC);
+"""
+_SCHEMA_VERSION = 1
+
+
+class ScoreStore:
+    """Рекорды поля размера size с записью в фоновом потоке.
+
+    on_change вызывается из рабочего потока, когда кэш рекордов обновлён.
+    """
+
+    def __init__(self, path, legacy_path=None, size=grid_size, on_change=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.size = size
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._top = []
+        self._unsaved = []  # счёт партий, которые ещё не записаны в базу
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def top(self):
+        """Лучшие результаты из кэша, по убыванию."""
+        with self._lock:
+            return list(self._top)
+
+    def record(self, game):
+        """Запоминает законченную партию; сразу возвращается."""
+        with self._lock:
+            # Кэш обновляется сразу, база — в фоне
+            self._unsaved.append(game.score)
+            self._top = sorted(self._top + [game.score], reverse=True)[:TOP_SIZE]
+        self._queue.put(
+            (
+                game.score,
+                game.lines,
+                game.play_time,
+                len(game.moves),
+                game.seed,
+                game.board.size,
+                time.time(),
+            )
+        )
+
+    def flush(self, timeout=2.0):
+        """Ждёт записи всех поставленных в очередь партий."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT / 1000)
+        connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+        return connection
+
+    def _run(self):
+        try:
+            connection = self._open()
+        except (sqlite3.Error, OSError):
+            connection = None  # Без базы рекорды живут только в кэше
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            if connection is None:
+                continue
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT INTO games "
+                        "(score, lines, duration, moves, seed, size, finished_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        item,
+                    )
+                with self._lock:
+                    self._unsaved.remove(item[0])
+                # Другие копии игры тоже могли записать рекорды
+                self._load_top(connection)
+            except sqlite3.Error:
+                pass
+
+    def _open(self):
+        """Открывает базу, создаёт таблицы, переносит records.txt и читает рекорды."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.executescript(_SCHEMA)
+        with connection:
+            # Проверка версии и перенос — одна транзакция под блокировкой
+            # записи: две копии игры, запущенные одновременно, не перенесут
+            # records.txt дважды
+            connection.execute("BEGIN IMMEDIATE")
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            # Версия ставится только после переноса: база, открытая без
+            # records.txt, перенесёт его при следующем открытии из игры
+            if version < _SCHEMA_VERSION and self.legacy_path:
+                self._migrate_legacy(connection)
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self._load_top(connection)
+        return connection
+
+    def _migrate_legacy(self, connection):
+        """Переносит рекорды из старого records.txt (поле 8x8, без истории)."""
+        try:
+            with open(self.legacy_path, encoding="utf-8") as file:
+                scores = [int(value) for value in file.read().split()]
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        connection.executemany(
+            "INSERT INTO games (score, size, finished_at) VALUES (?, 8, ?)",
+            [(score, now) for score in scores if score > 0],
+        )
+
+    def _load_top(self, connection):
+        scores = top_scores(connection, self.size)
+        with self._lock:
+            # Партии, которые ещё ждут записи, остаются в кэше
+            scores += self._unsaved
+            self._top = sorted(scores, reverse=True)[:TOP_SIZE]
+        if self.on_change is not None:
+            self.on_change()
+
+
+def top_scores(connection, size, limit=TOP_SIZE):
+    """Лучшие результаты на поле size, по убыванию."""
+    rows = connection.execute(
+        "SELECT score FROM games WHERE size = ? ORDER BY score DESC LIMIT ?",
+        (size, limit),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def recent_games(connection, size, limit=20):
+    """Последние партии: (счёт, линии, длительность, ходы, seed)."""
+    return connection.execute(
+        "SELECT score, lines, duration, moves, seed FROM games "
+        "WHERE size = ? ORDER BY id DESC LIMIT ?",
+        (size, limit),
+    ).fetchall()
+
+
+def open_readonly(path):
+    """Открывает базу только для чтения: она не создаётся и не меняется."""
+    uri = pathlib.Path(path).absolute().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Последние партии из базы рекордов")
+    parser.add_argument("path")
+    parser.add_argument("--size", type=int, default=grid_size)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        connection = open_readonly(args.path)
+        top = top_scores(connection, args.size)
+        games = recent_games(connection, args.size, args.limit)
+    except sqlite3.Error as error:
+        parser.exit(1, f"не удалось прочитать {args.path}: {error}\n")
+    print(f"рекорды: {', '.join(map(str, top)) or 'нет'}")
+    for score, lines, duration, moves, seed in games:
+        duration = f"{duration:.0f} с" if duration is not None else "-"
+        print(
+            f"счёт {score:6}  линий {lines or 0:4}  ходов {moves or 0:4}  "
+            f"{duration:>7}  seed {seed}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Общие настройки игры: размеры и цвета."""
+
+import os
+
+# Размер поля: 8 — классика, большие поля (до 32) — «марафон».
+# Задаётся переменной окружения: BLOCK_BLAST_GRID=16 python main.py
+MIN_GRID, MAX_GRID = 5, 32
+grid_size = int(os.environ.get("BLOCK_BLAST_GRID", "8"))
+if not MIN_GRID <= grid_size <= MAX_GRID:
+    raise ValueError(f"размер поля должен быть от {MIN_GRID} до {MAX_GRID}")
+
+# Клетка уменьшается, чтобы поле не выходило за MAX_FIELD пикселей
+MAX_FIELD = 480
+block_size = min(40, MAX_FIELD // grid_size)
+field_top = 100  # Отступ поля сверху (под счёт)
+
+# Размеры экрана: 450x600 для поля 8x8, больше — если поле не помещается
+width = max(450, grid_size * block_size + 50)
+height = max(600, field_top + grid_size * block_size + 180)
+
+# Цвета
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GRAY = (200, 200, 200)
+BG_COLOR = (135, 206, 250)  # Фон
+SHADOW_COLOR = (100, 100, 100, 50)  # Тень блока
+SHADOW_OFFSET = 5  # Смещение тени блока
+HINT_ALPHA = 110  # Прозрачность подсказки на поле
+PREVIEW_ALPHA = 130  # Прозрачность предпросмотра броска
+PREVIEW_OK_COLOR = (255, 255, 255)  # Блок можно поставить
+PREVIEW_BAD_COLOR = (120, 0, 0)  # Блок поставить нельзя
+CLEAR_HIGHLIGHT = (255, 255, 255, 120)  # Линии, которые очистятся
+block_colors = [
+    (239, 83, 80),  # Красный
+    (102, 187, 106),  # Зеленый
+    (66, 165, 245),  # Синий
+    (255, 238, 88),  # Желтый
+    (171, 71, 188),  # Фиолетовый
+]
+
+# Выдавать только такие наборы блоков, которые можно поставить на поле
+GUARANTEED_PLAYABLE = False
+
+# Частота кадров
+FPS = 144  # Ограничение во время перетаскивания и анимаций
+IDLE_TIMEOUT = 500  # Сколько мс ждать событие в простое
+FADE_TIME = 1000  # Длительность затемнения фона в меню проигрыша, мс
+PAUSE_FADE_TIME = 150  # Длительность появления меню паузы, мс
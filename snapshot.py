@@ -0,0 +1,252 @@
+"""Компактные снимки партии: отмена и повтор ходов, автосохранение.
+
+Снимок — строка байтов (little-endian):
+    заголовок  "BBS" + версия, размер поля, флаги (по 1 байту), seed
+               (8 байт), счёт, число выданных наборов, очищенные линии,
+               время игры в мс, число ходов (по 4 байта), число блоков
+               в лотке (1 байт)
+    поле       номер цвета каждой клетки, по байту (Board.colors)
+    лоток      по 3 байта: фигура, номер цвета, место в лотке
+    ходы       по 3 байта, как в replay.py; нет в снимках с флагом
+               FLAG_NO_MOVES, там записано только число ходов
+
+Генератор случайных чисел отдельно сохранять не нужно: каждый набор
+блоков выводится из seed и номера набора. Снимок партии на поле 8x8
+без ходов — около сотни байт (на поле 32x32 — около килобайта) и
+снимается за единицы микросекунд, поэтому история отмены хранит снимок
+каждого хода без ограничений. Запись ходов в истории одна на всю ветку:
+при отмене она обрезается, при повторе берётся снова. Полная запись ходов
+нужна только автосохранению.
+
+Автосохранение пишет последний снимок в фоновом потоке через временный
+файл и os.replace, так что ход не ждёт диска, а файл на диске всегда
+целый: после падения или закрытия окна партия продолжается с него.
+"""
+
+import os
+import struct
+import threading
+from itertools import chain
+
+from engine import PIECES
+from settings import block_colors
+
+MAGIC = b"BBS"
+VERSION = 2
+_HEADER = struct.Struct("<3sBBBQIIIIIB")
+FLAG_GUARANTEED_PLAYABLE = 1
+FLAG_NO_MOVES = 2  # в снимке только число ходов, без самих ходов
+
+
+class SnapshotError(Exception):
+    """Снимок повреждён или сделан для другого поля."""
+
+
+def capture(game, moves=True):
+    """Снимок партии в байтах; moves=False — без записи ходов (для отмены)."""
+    board = game.board
+    flags = FLAG_GUARANTEED_PLAYABLE if game.guaranteed_playable else 0
+    if not moves:
+        flags |= FLAG_NO_MOVES
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        board.size,
+        flags,
+        game.seed,
+        game.score,
+        game.refills,
+        game.lines,
+        int(game.play_time * 1000),
+        len(game.moves),
+        len(game.blocks),
+    )
+    tray = bytes(
+        chain.from_iterable(
+            (block.template_id, block.color_id, block.slot) for block in game.blocks
+        )
+    )
+    if not moves:
+        return header + board.colors + tray
+    return header + board.colors + tray + bytes(chain.from_iterable(game.moves))
+
+
+def restore(game, data, moves=None):
+    """Возвращает партию game в состояние из снимка.
+
+    Для снимка без записи ходов ходы берутся из начала списка moves
+    (по умолчанию — из текущей записи game.moves).
+    """
+    if len(data) < _HEADER.size:
+        raise SnapshotError("снимок слишком короткий")
+    (
+        magic,
+        version,
+        size,
+        flags,
+        seed,
+        score,
+        refills,
+        lines,
+        play_time,
+        count,
+        blocks,
+    ) = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError("неизвестный формат снимка")
+    if size != game.board.size:
+        raise SnapshotError(f"снимок сделан на поле {size}x{size}")
+    cells = size * size
+    stored = 0 if flags & FLAG_NO_MOVES else count
+    if len(data) != _HEADER.size + cells + (blocks + stored) * 3:
+        raise SnapshotError("длина снимка не совпадает с заголовком")
+
+    offset = _HEADER.size
+    colors = data[offset : offset + cells]
+    offset += cells
+    tray = [tuple(data[i : i + 3]) for i in range(offset, offset + blocks * 3, 3)]
+    offset += blocks * 3
+    if any(pid >= len(PIECES) for pid, _, _ in tray):
+        raise SnapshotError("в лотке неизвестная фигура")
+    if any(not 0 < color_id <= len(block_colors) for _, color_id, _ in tray):
+        raise SnapshotError("в лотке неизвестный цвет")
+    if max(colors) > len(block_colors):
+        raise SnapshotError("на поле неизвестный цвет")
+    if flags & FLAG_NO_MOVES:
+        if moves is None:
+            moves = game.moves
+        if count > len(moves):
+            raise SnapshotError("в записи нет ходов снимка")
+        moves = moves[:count]
+    else:
+        moves = [tuple(data[i : i + 3]) for i in range(offset, len(data), 3)]
+
+    game.guaranteed_playable = bool(flags & FLAG_GUARANTEED_PLAYABLE)
+    game.load_state(
+        seed, score, refills, moves, colors, tray, lines, play_time / 1000
+    )
+
+
+class History:
+    """Неограниченная отмена и повтор ходов на снимках без записи ходов."""
+
+    def __init__(self):
+        self._undo = []
+        self._redo = []
+        # Запись ходов самого позднего состояния ветки: из неё берутся
+        # ходы при отмене и повторе
+        self._moves = None
+
+    def push(self, snapshot):
+        """Запоминает состояние перед ходом (capture(game, moves=False)).
+
+        Новый ход отменяет возможность повтора.
+        """
+        self._undo.append(snapshot)
+        self._redo.clear()
+        self._moves = None
+
+    def undo(self, game):
+        """Отменяет ход партии game; возвращает False, если отменять нечего."""
+        if not self._undo:
+            return False
+        if self._moves is None:
+            self._moves = game.moves
+        self._redo.append(capture(game, moves=False))
+        self._restore(game, self._undo.pop())
+        return True
+
+    def redo(self, game):
+        """Повторяет отменённый ход; возвращает False, если повторять нечего."""
+        if not self._redo:
+            return False
+        self._undo.append(capture(game, moves=False))
+        self._restore(game, self._redo.pop())
+        return True
+
+    def _restore(self, game, snapshot):
+        # Время игры идёт дальше: отмена хода не отматывает часы партии,
+        # из снимка оно берётся только при продолжении с автосохранения
+        play_time = game.play_time
+        restore(game, snapshot, self._moves)
+        game.play_time = play_time
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._moves = None
+
+
+def load(path):
+    """Содержимое файла автосохранения или None, если его нет или он не читается."""
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+# Запрос к потоку автосохранения: удалить файл
+_DISCARD = object()
+
+
+class Autosaver:
+    """Записывает последний снимок в фоновом потоке.
+
+    Если снимки приходят быстрее, чем пишется файл, промежуточные
+    пропускаются: на диске нужен только последний.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def save(self, snapshot):
+        """Ставит снимок в очередь на запись; возвращается сразу."""
+        self._submit(snapshot)
+
+    def discard(self):
+        """Удаляет файл автосохранения (партия закончена)."""
+        self._submit(_DISCARD)
+
+    def flush(self, timeout=1.0):
+        """Ждёт, пока последний запрос будет записан."""
+        return self._idle.wait(timeout)
+
+    def _submit(self, request):
+        with self._lock:
+            self._pending = request
+            self._idle.clear()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                request, self._pending = self._pending, None
+            try:
+                if request is _DISCARD:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                elif request is not None:
+                    self._write(request)
+            except OSError:
+                pass  # Автосохранение не должно останавливать игру
+            with self._lock:
+                if self._pending is None:
+                    self._idle.set()
+
+    def _write(self, snapshot):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(snapshot)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
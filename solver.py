@@ -0,0 +1,217 @@
+"""Подсказка: поиск лучшей последовательности установки блоков из лотка.
+
+Перебираются все порядки и позиции оставшихся блоков с очисткой линий
+между шагами. Одинаковые состояния (поле + оставшиеся фигуры), в которые
+можно прийти разными порядками, считаются один раз благодаря таблице
+транспозиций. Ветвление ограничивается лучом: на каждом уровне дальше
+рассматриваются только самые перспективные ходы. Ширина луча растёт,
+пока не кончится отведённое время, поэтому ответ есть всегда.
+"""
+
+import threading
+import time
+
+from engine import PIECE_SIZES, PIECES, get_masks, iter_bits, line_points
+
+# Веса оценки итоговой позиции
+LINE_WEIGHT = 10  # бонус за каждую очищенную линию сверх очков
+MOBILITY_WEIGHT = 0.5  # за каждую свободную позицию фигур на итоговом поле
+DEAD_END = -100000  # за каждый блок, который некуда поставить
+
+BEAM_WIDTHS = (2, 4, 8, 16, 32)  # ширина луча по итерациям
+# С какого размера поля первая (не ограниченная по времени) итерация
+# идёт с лучом 1: на больших полях даже луч 2 не укладывается в TIME_BUDGET
+GREEDY_FIRST_SIZE = 17
+TIME_BUDGET = 0.05  # секунд на одну подсказку
+TABLE_LIMIT = 200000  # максимальный размер таблицы транспозиций
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Solver:
+    def __init__(self, size):
+        self.size = size
+        self.masks = get_masks(size)
+        self.beams = BEAM_WIDTHS
+        if size >= GREEDY_FIRST_SIZE:
+            self.beams = (1,) + BEAM_WIDTHS
+        # (занятость, оставшиеся фигуры, ширина луча) -> (оценка, ходы)
+        self.table = {}
+        self._mobility = {}
+        self._deadline = None
+
+        # Для каждой позиции фигуры: маска соседних клеток и число
+        # касаний края поля — по ним упорядочиваются равноценные ходы
+        size_mask = self.masks.full
+        self._contacts = []
+        for positions in self.masks.placements:
+            contacts = {}
+            for cell, mask in positions.items():
+                neighbors = 0
+                walls = 0
+                for index in iter_bits(mask):
+                    row, col = divmod(index, size)
+                    for d_row, d_col in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                        n_row, n_col = row + d_row, col + d_col
+                        if 0 <= n_row < size and 0 <= n_col < size:
+                            neighbors |= 1 << (n_row * size + n_col)
+                        else:
+                            walls += 1
+                contacts[cell] = (neighbors & ~mask & size_mask, walls)
+            self._contacts.append(contacts)
+
+    def mobility(self, occupied):
+        """Сколько позиций всех фигур свободно на поле.
+
+        Позиции считаются сдвигами маски свободных клеток (как в
+        Board.anchors), а не перебором, поэтому оценка почти не зависит
+        от размера поля.
+        """
+        count = self._mobility.get(occupied)
+        if count is None:
+            masks = self.masks
+            count = 0
+            for pid in range(len(PIECES)):
+                count += bin(masks.free_anchors(occupied, pid)).count("1")
+            if len(self._mobility) > TABLE_LIMIT:
+                self._mobility.clear()
+            self._mobility[occupied] = count
+        return count
+
+    def best_sequence(self, occupied, pids, time_budget=TIME_BUDGET):
+        """Лучшая последовательность ходов [(pid, row, col), ...] и её оценка."""
+        remaining = tuple(sorted(pids))
+        if len(self.table) > TABLE_LIMIT:
+            self.table.clear()
+        self._deadline = time.perf_counter() + time_budget
+        best = (DEAD_END * len(remaining), ())
+        for number, beam in enumerate(self.beams):
+            # Первая (самая узкая) итерация всегда доводится до конца
+            try:
+                best = self._search(occupied, remaining, beam, bool(number))
+            except _Timeout:
+                break
+        return list(best[1]), best[0]
+
+    def _search(self, occupied, remaining, beam, timed):
+        key = (occupied, remaining, beam)
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+        if timed and time.perf_counter() > self._deadline:
+            raise _Timeout
+
+        if not remaining:
+            result = (self.mobility(occupied) * MOBILITY_WEIGHT, ())
+            self.table[key] = result
+            return result
+
+        masks = self.masks
+        size = self.size
+        candidates = []
+        for i, pid in enumerate(remaining):
+            if i and pid == remaining[i - 1]:
+                continue  # одинаковые фигуры дают одинаковые ветви
+            if timed and time.perf_counter() > self._deadline:
+                raise _Timeout
+            rest = remaining[:i] + remaining[i + 1 :]
+            contacts = self._contacts[pid]
+            shape = masks.shapes[pid]
+            height, width = len(PIECES[pid]), len(PIECES[pid][0])
+            for index in iter_bits(masks.free_anchors(occupied, pid)):
+                cell = divmod(index, size)
+                mask = shape << index
+                placed = occupied | mask
+                # Заполниться могут только строки и столбцы под фигурой
+                cleared = lines = 0
+                for line in masks.rows[cell[0] : cell[0] + height]:
+                    if placed & line == line:
+                        cleared |= line
+                        lines += 1
+                for line in masks.cols[cell[1] : cell[1] + width]:
+                    if placed & line == line:
+                        cleared |= line
+                        lines += 1
+                settled = placed & ~cleared
+                gain = (
+                    PIECE_SIZES[pid] + line_points(lines, size) + LINE_WEIGHT * lines
+                )
+                neighbors, walls = contacts[cell]
+                touch = bin(neighbors & occupied).count("1") + walls
+                candidates.append((gain, touch, settled, rest, (pid,) + cell))
+
+        if not candidates:
+            result = (DEAD_END * len(remaining), ())
+            self.table[key] = result
+            return result
+
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+        best = None
+        for gain, _, settled, rest, move in candidates[:beam]:
+            value, path = self._search(settled, rest, beam, timed)
+            value += gain
+            if best is None or value > best[0]:
+                best = (value, (move,) + path)
+        self.table[key] = best
+        return best
+
+
+class HintWorker:
+    """Считает подсказку в фоновом потоке, не задерживая отрисовку.
+
+    on_ready вызывается из рабочего потока, когда готов новый результат.
+    """
+
+    def __init__(self, size, on_ready=None, time_budget=TIME_BUDGET):
+        self.solver = Solver(size)
+        self.on_ready = on_ready
+        self.time_budget = time_budget
+        self.enabled = False  # показывать ли подсказку (клавиша H)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._request = None
+        self._pending = None
+        self._result = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _key(occupied, pids):
+        return occupied, tuple(sorted(pids))
+
+    def request(self, occupied, pids):
+        """Запрашивает подсказку для позиции; старый запрос отменяется."""
+        key = self._key(occupied, pids)
+        with self._lock:
+            if key == self._pending or key == self._request:
+                return
+            if self._result is not None and self._result[0] == key:
+                return
+            self._request = key
+        self._wakeup.set()
+
+    def hint(self, occupied, pids):
+        """Готовая подсказка для позиции или None, если она ещё считается."""
+        key = self._key(occupied, pids)
+        with self._lock:
+            if self._result is not None and self._result[0] == key:
+                return self._result[1]
+        return None
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                key, self._request = self._request, None
+                self._pending = key
+            if key is None:
+                continue
+            path, _ = self.solver.best_sequence(*key, time_budget=self.time_budget)
+            with self._lock:
+                self._result = (key, path)
+                self._pending = None
+            if self.on_ready is not None:
+                self.on_ready()
@@ -0,0 +1,38 @@
+"""Общий планировщик кадров для всех игровых циклов.
+
+Пока что-то движется (перетаскивание, анимация), цикл работает с
+заданной частотой. В простое поток спит в ``pygame.event.wait`` и
+просыпается только по событию или по таймауту.
+"""
+
+import pygame
+
+from settings import FPS, IDLE_TIMEOUT
+
+
+class FrameScheduler:
+    def __init__(self, fps=FPS, idle_timeout=IDLE_TIMEOUT):
+        self.fps = fps  # 0 — без ограничения
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+
+    def events(self, active):
+        """Дожидается следующего кадра и возвращает накопившиеся события.
+
+        active — идёт ли сейчас перетаскивание или анимация.
+        """
+        if active:
+            self.clock.tick(self.fps)
+            return pygame.event.get()
+
+        event = pygame.event.wait(self.idle_timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        # Ограничение частоты и в простое: поток событий мыши не должен
+        # разгонять цикл выше fps
+        self.clock.tick(self.fps)
+        return events
+
+    def get_fps(self):
+        """Фактическая частота кадров (среднее за последние кадры)."""
+        return self.clock.get_fps()
@@ -0,0 +1,315 @@
+"""Замеры производительности ядра игры и отрисовки.
+
+Все замеры идут с фиксированными seed и без окна (SDL_VIDEODRIVER=dummy):
+- can_place_block, is_game_over (без кэша), clear_lines на полях разной
+  заполненности, generate_blocks там же для каждого уровня сложности,
+  обычный и с guaranteed_playable;
+- стоимость одного хода на полях от 8x8 до 32x32;
+- полная перерисовка кадра и кадр перетаскивания блока;
+- время от запуска main.py до первого кадра (main.py --startup-time).
+
+Результаты пишутся в JSON; с --compare сравниваются с сохранённым
+эталоном, и замедление больше порога считается регрессией:
+
+    python tools/bench.py --output bench.json
+    python tools/bench.py --compare bench.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame  # noqa: E402
+
+from engine import PIECES  # noqa: E402
+from game import Block, Game  # noqa: E402
+from pieces import TIERS  # noqa: E402
+from render import BoardRenderer, build_piece_sprites  # noqa: E402
+from settings import block_colors, height, width  # noqa: E402
+
+FILL_LEVELS = (0.0, 0.25, 0.5, 0.75)
+BOARD_SIZES = (8, 10, 16, 24, 32)
+SEED = 12345
+
+
+def measure(func, repeat=7, min_time=0.05):
+    """Медиана и минимум времени одного вызова в микросекундах."""
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    runs = [t / number * 1e6 for t in timer.repeat(repeat, number)]
+    return {"median_us": statistics.median(runs), "min_us": min(runs)}
+
+
+def filled_game(fill, seed=SEED, size=8):
+    """Партия, у которой занята доля fill клеток поля (без полных линий)."""
+    game = Game(seed=seed, size=size)
+    board = game.board
+    rng = random.Random(seed)
+    cells = list(range(board.size * board.size))
+    rng.shuffle(cells)
+    target = int(fill * len(cells))
+    filled = 0
+    row_fill = [0] * size
+    col_fill = [0] * size
+    for index in cells:
+        if filled >= target:
+            break
+        row, col = divmod(index, size)
+        # Полных линий быть не должно
+        if row_fill[row] == size - 1 or col_fill[col] == size - 1:
+            continue
+        row_fill[row] += 1
+        col_fill[col] += 1
+        filled += 1
+        board.occupied |= 1 << index
+        board.colors[index] = 1
+    board.recount()
+    return game
+
+
+def bench_core(results):
+    for fill in FILL_LEVELS:
+        tag = f"fill{int(fill * 100)}"
+        game = filled_game(fill)
+        board = game.board
+
+        block = game.blocks[0]
+        block.move_to_cell(3, 3)
+        results[f"can_place_block/{tag}"] = measure(
+            lambda: game.can_place_block(block)
+        )
+
+        def cold_game_over():
+            game._game_over = None
+            board._has_move.clear()
+            return game.is_game_over()
+
+        results[f"is_game_over/{tag}"] = measure(cold_game_over)
+        results[f"clear_lines/{tag}"] = measure(game.clear_lines)
+
+        # Очистка двух полных линий; состояние восстанавливается перед вызовом
+        board.occupied |= board.masks.rows[0] | board.masks.cols[0]
+        board.recount()
+        occupied = board.occupied
+        colors = bytes(board.colors)
+        row_fill = list(board.row_fill)
+        col_fill = list(board.col_fill)
+
+        def clear_two_lines():
+            board.occupied = occupied
+            board.colors[:] = colors
+            board.row_fill[:] = row_fill
+            board.col_fill[:] = col_fill
+            game.clear_lines()
+
+        results[f"clear_lines_full/{tag}"] = measure(clear_two_lines)
+
+        # Замеры выше набирают счёт, поэтому выдача блоков замеряется на
+        # новой партии со счётом начала каждого уровня сложности
+        low = 0
+        for tier in TIERS:
+            for playable in (False, True):
+                game = filled_game(fill)
+                game.score = low
+                game.guaranteed_playable = playable
+                name = "generate_blocks_playable" if playable else "generate_blocks"
+                results[f"{name}/{tag}/{tier.name}"] = measure(game.generate_blocks)
+            low = tier.max_score
+
+
+def bench_sizes(results):
+    """Стоимость хода в зависимости от размера поля (заполнено наполовину).
+
+    Ход — то, что игра делает при отпускании блока: предпросмотр,
+    установка, очистка линий и проверка на проигрыш без кэша.
+    """
+    for size in BOARD_SIZES:
+        tag = f"{size}x{size}"
+        game = filled_game(0.5, size=size)
+        board = game.board
+        pids = [block.template_id for block in game.blocks]
+        occupied = board.occupied
+        colors = bytes(board.colors)
+        row_fill = list(board.row_fill)
+        col_fill = list(board.col_fill)
+        # Первая свободная позиция для каждой фигуры лотка
+        moves = []
+        for pid in pids:
+            anchors = board.anchors(pid)
+            if anchors:
+                index = (anchors & -anchors).bit_length() - 1
+                moves.append((pid,) + divmod(index, size))
+
+        def move():
+            board.occupied = occupied
+            board.colors[:] = colors
+            board.row_fill[:] = row_fill
+            board.col_fill[:] = col_fill
+            board._has_move.clear()
+            board._previews.clear()
+            for pid, row, col in moves:
+                board.preview(pid, row, col)
+                board.place(pid, row, col, 1)
+                board.clear_lines()
+                for other in pids:
+                    board.has_move(other)
+
+        results[f"move/{tag}"] = measure(move)
+
+        def cold_game_over():
+            board._has_move.clear()
+            return [board.has_move(pid) for pid in range(len(PIECES))]
+
+        results[f"has_move_all/{tag}"] = measure(cold_game_over)
+
+
+def bench_render(results):
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((width, height))
+    Block.sprites = build_piece_sprites(block_colors)
+
+    game = filled_game(0.5)
+    renderer = BoardRenderer(screen, game.board, game.field_x, game.field_y)
+    renderer.sync_cells()
+
+    def full_frame():
+        renderer.invalidate()
+        renderer.draw(game.score, game.blocks)
+
+    results["render/full_frame"] = measure(full_frame)
+
+    block = game.blocks[0]
+    block.dragging = True
+    renderer.draw(game.score, game.blocks)
+    positions = [(100 + step, 300 - step) for step in range(0, 40, 4)]
+    state = {"step": 0}
+
+    def drag_frame():
+        state["step"] = (state["step"] + 1) % len(positions)
+        block.move(*positions[state["step"]])
+        renderer.draw(game.score, game.blocks)
+
+    results["render/drag_frame"] = measure(drag_frame)
+    pygame.display.quit()
+
+
+def bench_startup(results, repeat=5):
+    """Время до первого кадра: python main.py --startup-time.
+
+    startup/first_frame — снаружи, от запуска процесса (вместе с загрузкой
+    интерпретатора); startup/in_process — то, что намерила сама игра.
+    Рекорды и автосохранение игра ищет во временном каталоге, чтобы
+    замер не трогал data/ и каждый запуск начинался с пустой базы.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    wall, inner = [], []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as data_path:
+            env["BLOCK_BLAST_DATA"] = data_path
+            start = time.perf_counter()
+            child = subprocess.run(
+                [sys.executable, "main.py", "--startup-time"],
+                cwd=ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        elapsed = time.perf_counter() - start
+        match = re.search(r"Первый кадр через ([\d.]+) мс", child.stdout)
+        if match is None:
+            continue
+        wall.append(elapsed * 1e6)
+        inner.append(float(match.group(1)) * 1000)
+    for name, runs in (("startup/first_frame", wall), ("startup/in_process", inner)):
+        if runs:
+            results[name] = {"median_us": statistics.median(runs), "min_us": min(runs)}
+
+
+def compare(results, baseline, threshold, metric="min_us"):
+    """Печатает сравнение с эталоном; возвращает список регрессий.
+
+    По умолчанию сравнивается минимум: он меньше всего зависит от фоновой
+    нагрузки на машине.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:32} {current[metric]:12.2f} мкс  (нет в эталоне)")
+            continue
+        ratio = current[metric] / old[metric] if old[metric] else 1.0
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  РЕГРЕССИЯ"
+            regressions.append(name)
+        print(
+            f"{name:32} {current[metric]:12.2f} мкс  "
+            f"было {old[metric]:12.2f}  x{ratio:.2f}{mark}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности")
+    parser.add_argument("--output", help="куда записать результаты (JSON)")
+    parser.add_argument("--compare", help="эталонный JSON для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--metric", choices=("min_us", "median_us"), default="min_us")
+    parser.add_argument(
+        "--only", choices=("core", "sizes", "render", "startup"), action="append"
+    )
+    args = parser.parse_args()
+
+    groups = args.only or ["core", "sizes", "render", "startup"]
+    results = {}
+    if "core" in groups:
+        bench_core(results)
+    if "sizes" in groups:
+        bench_sizes(results)
+    if "render" in groups:
+        bench_render(results)
+    if "startup" in groups:
+        bench_startup(results)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "pieces": len(PIECES),
+            "seed": SEED,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold, args.metric)
+        sys.exit(1 if regressions else 0)
+
+    for name, value in sorted(results.items()):
+        print(f"{name:32} {value['median_us']:12.2f} мкс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Ферма симуляций: много партий без окна на всех ядрах для настройки баланса.
+
+Партии играются по тем же правилам, что и в игре (Game.drop_block,
+уровни сложности из data/difficulty.json, очки из place_block и
+clear_lines), одной из простых стратегий:
+- random — случайный допустимый ход;
+- greedy — ход с наибольшими очками сразу;
+- max-lines — ход, очищающий больше всего линий.
+
+Партии раздаются пачками в ProcessPoolExecutor, результаты пачек
+сливаются по мере готовности в общий отчёт: длина партий, распределение
+счёта и по каждому уровню сложности — как часто фигуры каждой группы
+оказывались в лотке в момент проигрыша.
+
+    python tools/farm.py --games 100000 --policy greedy --output farm.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import PIECE_SIZES, PIECES, iter_bits, line_points  # noqa: E402
+from game import Game  # noqa: E402
+from pieces import GROUP_NAMES, PIECE_GROUPS, TIERS, difficulty_tier  # noqa: E402
+from settings import grid_size  # noqa: E402
+
+MAX_MOVES = 10000  # партия обрывается, если стратегия играет слишком долго
+HISTOGRAM_BINS = 10
+
+
+def legal_moves(game):
+    """Все допустимые ходы: (блок, строка, столбец)."""
+    board = game.board
+    for block in game.blocks:
+        for index in iter_bits(board.anchors(block.template_id)):
+            yield (block,) + divmod(index, board.size)
+
+
+def lines_cleared(board, pid, row, col):
+    """Сколько линий очистит фигура, поставленная в (row, col).
+
+    Проверяются только строки и столбцы, которые задевает фигура.
+    """
+    occupied = board.occupied | board.placement(pid, row, col)
+    template = PIECES[pid]
+    masks = board.masks
+    lines = 0
+    for mask in masks.rows[row : row + len(template)]:
+        lines += occupied & mask == mask
+    for mask in masks.cols[col : col + len(template[0])]:
+        lines += occupied & mask == mask
+    return lines
+
+
+def _best_move(game, rng, value):
+    """Ход с наибольшим value(board, pid, row, col); равные выбираются случайно."""
+    board = game.board
+    best, best_value = [], None
+    for move in legal_moves(game):
+        block, row, col = move
+        current = value(board, block.template_id, row, col)
+        if best_value is None or current > best_value:
+            best, best_value = [move], current
+        elif current == best_value:
+            best.append(move)
+    return rng.choice(best)
+
+
+def random_policy(game, rng):
+    return rng.choice(list(legal_moves(game)))
+
+
+def greedy_policy(game, rng):
+    return _best_move(
+        game,
+        rng,
+        lambda board, pid, row, col: PIECE_SIZES[pid]
+        + line_points(lines_cleared(board, pid, row, col), board.size),
+    )
+
+
+def max_lines_policy(game, rng):
+    return _best_move(game, rng, lines_cleared)
+
+
+# Стратегия: функция (game, rng) -> (блок, строка, столбец)
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "max-lines": max_lines_policy,
+}
+
+
+def play(seed, policy, size=grid_size, guaranteed_playable=False):
+    """Играет одну партию; возвращает (счёт, ходов, уровень в конце, выдано, проиграно).
+
+    «Выдано» и «проиграно» — счётчики по (уровень, фигура): сколько раз
+    фигура попадала в лоток и сколько раз осталась в нём при проигрыше.
+    """
+    game = Game(seed=seed, size=size, guaranteed_playable=guaranteed_playable)
+    rng = random.Random(seed)
+    dealt = Counter()
+    deaths = Counter()
+    tier = difficulty_tier(game.score).name
+    dealt.update((tier, block.template_id) for block in game.blocks)
+
+    while not game.is_game_over() and len(game.moves) < MAX_MOVES:
+        block, row, col = policy(game, rng)
+        refills = game.refills
+        block.move_to_cell(row, col)
+        game.drop_block(block)
+        if game.refills != refills:
+            # Новый набор выдан по счёту после хода, как в generate_blocks
+            tier = difficulty_tier(game.score).name
+            dealt.update((tier, block.template_id) for block in game.blocks)
+
+    if game.is_game_over():
+        deaths.update((tier, block.template_id) for block in game.blocks)
+    return game.score, len(game.moves), tier, dealt, deaths
+
+
+def new_totals():
+    return {
+        "scores": [],
+        "moves": [],
+        "final_tier": Counter(),
+        "dealt": Counter(),
+        "deaths": Counter(),
+    }
+
+
+def merge(totals, part):
+    totals["scores"].extend(part["scores"])
+    totals["moves"].extend(part["moves"])
+    for key in ("final_tier", "dealt", "deaths"):
+        totals[key].update(part[key])
+
+
+def run_chunk(seeds, policy_name, size, guaranteed_playable):
+    """Пачка партий в процессе-исполнителе; возвращает частичные итоги."""
+    policy = POLICIES[policy_name]
+    totals = new_totals()
+    for seed in seeds:
+        score, moves, tier, dealt, deaths = play(
+            seed, policy, size, guaranteed_playable
+        )
+        totals["scores"].append(score)
+        totals["moves"].append(moves)
+        totals["final_tier"][tier] += 1
+        totals["dealt"].update(dealt)
+        totals["deaths"].update(deaths)
+    return totals
+
+
+def percentiles(values, points=(10, 50, 90, 99)):
+    ordered = sorted(values)
+    result = {"mean": statistics.fmean(ordered), "max": ordered[-1]}
+    for point in points:
+        index = min(len(ordered) - 1, len(ordered) * point // 100)
+        result[f"p{point}"] = ordered[index]
+    return result
+
+
+def histogram(values, bins=HISTOGRAM_BINS):
+    """Равные интервалы от 0 до максимума: [(начало, конец, число партий)]."""
+    top = max(values) + 1
+    width = max(1, -(-top // bins))
+    counts = Counter(value // width for value in values)
+    return [
+        (index * width, (index + 1) * width, counts.get(index, 0))
+        for index in range(-(-top // width))
+    ]
+
+
+def tier_report(totals):
+    """По уровням: доля партий, закончившихся на уровне, и смертность групп фигур."""
+    games = len(totals["scores"])
+    report = {}
+    for tier in TIERS:
+        groups = {}
+        for group, name in enumerate(GROUP_NAMES):
+            dealt = sum(
+                totals["dealt"][(tier.name, pid)]
+                for pid in range(len(PIECES))
+                if PIECE_GROUPS[pid] == group
+            )
+            deaths = sum(
+                totals["deaths"][(tier.name, pid)]
+                for pid in range(len(PIECES))
+                if PIECE_GROUPS[pid] == group
+            )
+            groups[name] = {
+                "dealt": dealt,
+                "deaths": deaths,
+                "death_rate": deaths / dealt if dealt else 0.0,
+            }
+        report[tier.name] = {
+            "max_score": tier.max_score,
+            "ended_here": totals["final_tier"][tier.name] / games,
+            "groups": groups,
+        }
+    return report
+
+
+def build_report(totals, args, elapsed):
+    return {
+        "meta": {
+            "games": len(totals["scores"]),
+            "policy": args.policy,
+            "size": args.size,
+            "guaranteed_playable": args.guaranteed_playable,
+            "seed": args.seed,
+            "workers": args.workers,
+            "seconds": elapsed,
+        },
+        "moves": percentiles(totals["moves"]),
+        "score": percentiles(totals["scores"]),
+        "score_histogram": histogram(totals["scores"]),
+        "tiers": tier_report(totals),
+    }
+
+
+def print_report(report):
+    meta = report["meta"]
+    print(
+        f"партий: {meta['games']}, стратегия: {meta['policy']}, "
+        f"поле {meta['size']}x{meta['size']}, {meta['seconds']:.1f} с "
+        f"({meta['games'] / meta['seconds']:.0f} партий/с)"
+    )
+    for title, key in (("ходов", "moves"), ("счёт", "score")):
+        stats = report[key]
+        print(
+            f"{title:6} среднее {stats['mean']:9.1f}  p10 {stats['p10']:6}  "
+            f"p50 {stats['p50']:6}  p90 {stats['p90']:6}  p99 {stats['p99']:6}  "
+            f"макс {stats['max']}"
+        )
+
+    print("\nраспределение счёта:")
+    top = max(count for _, _, count in report["score_histogram"])
+    for start, end, count in report["score_histogram"]:
+        bar = "#" * round(40 * count / top)
+        print(f"  {start:7}-{end - 1:<7} {count:8} {bar}")
+
+    for name, tier in report["tiers"].items():
+        limit = tier["max_score"] if tier["max_score"] is not None else "∞"
+        print(
+            f"\nуровень {name} (до {limit}): "
+            f"закончилось партий {tier['ended_here']:.1%}"
+        )
+        for group, stats in tier["groups"].items():
+            print(
+                f"  {group:14} выдано {stats['dealt']:9}  в лотке при проигрыше "
+                f"{stats['deaths']:8}  ({stats['death_rate']:.2%})"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--size", type=int, default=grid_size)
+    parser.add_argument("--guaranteed-playable", action="store_true")
+    parser.add_argument("--seed", type=int, default=0, help="seed первой партии")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=250, help="партий в пачке")
+    parser.add_argument("--output", help="куда записать отчёт (JSON)")
+    args = parser.parse_args()
+
+    totals = new_totals()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(
+                run_chunk,
+                range(first, min(first + args.chunk, args.seed + args.games)),
+                args.policy,
+                args.size,
+                args.guaranteed_playable,
+            )
+            for first in range(args.seed, args.seed + args.games, args.chunk)
+        ]
+        for future in as_completed(futures):
+            merge(totals, future.result())
+            print(
+                f"\rсыграно {len(totals['scores'])}/{args.games}",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
+    print(file=sys.stderr)
+
+    report = build_report(totals, args, time.perf_counter() - start)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
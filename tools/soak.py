@@ -0,0 +1,157 @@
+"""Нагрузочная проверка перезапусков: тысячи партий подряд без роста памяти.
+
+Скрипт запускает настоящий main.main() без окна (SDL_VIDEODRIVER=dummy),
+подменив main.scheduler источником событий по сценарию: старт → партия
+случайными ходами (с заходом в паузу и обратно) → проигрыш → «Играть
+снова» → старт. Куда нажимать, сценарий узнаёт из main.view. Рекорды,
+автосохранение и запись партии пишутся во временный каталог.
+
+Глубина стека сравнивается при каждом показе стартового меню: если
+перезапуск снова станет рекурсивным, она начнёт расти. Скрипт
+завершается с ошибкой, если глубина стека изменилась или память после
+прогрева выросла больше допустимого.
+
+    python tools/soak.py --games 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import main as block_blast  # noqa: E402
+
+
+class SoakFinished(Exception):
+    """Сыграно нужное число партий."""
+
+
+class ScriptedEvents:
+    """Замена FrameScheduler: события выбираются по текущей сцене.
+
+    Сцену, её кнопки и партию показывает main.view.
+    """
+
+    def __init__(self, games, warmup, rng):
+        self.games = games
+        self.warmup = warmup
+        self.rng = rng
+        self.played = 0
+        self.paused = False  # пауза в текущей партии уже была
+        self.depth = None
+        self.baseline = None
+
+    def events(self, active):
+        pygame.event.get()  # События дисплея и фоновых потоков не копятся
+        view = block_blast.view
+        buttons = view.buttons
+        if view.name == block_blast.SCENE_START_MENU:
+            self.start_menu()
+            return [click(buttons["start"])]
+        if view.name == block_blast.SCENE_PLAYING:
+            if not self.paused:
+                self.paused = True
+                return [click(buttons["pause"])]
+            return self.random_move(view.game)
+        if view.name == block_blast.SCENE_PAUSED:
+            return [click(buttons["resume"])]
+        if view.name == block_blast.SCENE_GAME_OVER:
+            self.played += 1
+            self.paused = False
+            return [click(buttons["restart"])]
+        raise AssertionError(f"неизвестная сцена {view.name}")
+
+    def get_fps(self):
+        return 0.0
+
+    def start_menu(self):
+        depth = _stack_depth()
+        if self.depth is None:
+            self.depth = depth
+        assert depth == self.depth, f"глубина стека выросла: {self.depth} -> {depth}"
+        if self.played == self.warmup:
+            tracemalloc.start()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        if self.played == self.games:
+            raise SoakFinished
+
+    def random_move(self, game):
+        """Перетаскивание случайного блока в случайную допустимую клетку."""
+        board = game.board
+        moves = [
+            (block, cell)
+            for block in game.blocks
+            for cell, mask in board.masks.placements[block.template_id].items()
+            if not board.occupied & mask
+        ]
+        block, (row, col) = self.rng.choice(moves)
+        x, y = block.position
+        target = (
+            block.field_x + col * block_blast.block_size + 1,
+            block.field_y + row * block_blast.block_size + 1,
+        )
+        return [
+            pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x + 1, y + 1), button=1),
+            pygame.event.Event(pygame.MOUSEMOTION, pos=target),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=target, button=1),
+        ]
+
+
+def click(rect):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=rect.center, button=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    # Прогрев заполняет ограниченные кэши (надписи со счетом и т.п.)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument(
+        "--limit-kb", type=int, default=256, help="допустимый рост памяти"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    source = ScriptedEvents(args.games, args.warmup, random.Random(args.seed))
+    block_blast.scheduler = source
+    with tempfile.TemporaryDirectory() as data_dir:
+        block_blast.scores_path = os.path.join(data_dir, "scores.db")
+        block_blast.records_path = os.path.join(data_dir, "records.txt")
+        block_blast.autosave_path = os.path.join(data_dir, "autosave.bbs")
+        block_blast.replay_path = os.path.join(data_dir, "last_game.bbr")
+        block_blast.init_display()
+        try:
+            block_blast.main()
+        except SoakFinished:
+            pass
+        growth = 0
+        if source.baseline is not None:
+            growth = tracemalloc.get_traced_memory()[0] - source.baseline
+        tracemalloc.stop()
+        pygame.quit()
+
+    print(
+        f"партий: {source.played}, "
+        f"рост памяти после прогрева: {growth / 1024:.1f} КБ"
+    )
+    if growth > args.limit_kb * 1024:
+        sys.exit(1)
+
+
+def _stack_depth():
+    frame, depth = sys._getframe(), 0
+    while frame is not None:
+        frame, depth = frame.f_back, depth + 1
+    return depth
+
+
+if __name__ == "__main__":
+    main()